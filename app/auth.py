@@ -1,19 +1,163 @@
+import asyncio
 import base64
 import hashlib
 import hmac
+import json
 import logging
 import os
 import secrets
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import ContextManager, Optional
 
 from .config import settings
+from .db import SqlitePool
 
 logger = logging.getLogger(__name__)
 
 
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            token_hash TEXT UNIQUE NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_token_hash ON sessions(token_hash)")
+
+
+def _epoch_session_expiry(conn: sqlite3.Connection) -> None:
+    # Sessions keep their timestamps as integer epoch seconds and expiry gets an index so the
+    # sweeper can find expired rows without scanning. The token_hash UNIQUE constraint already
+    # carries an index, so the separate one is dropped.
+    conn.execute(
+        """
+        CREATE TABLE sessions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            token_hash TEXT UNIQUE NOT NULL,
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """
+    )
+    now = int(time.time())
+    rows = conn.execute("SELECT id, user_id, token_hash, created_at, expires_at FROM sessions").fetchall()
+    converted = []
+    for row in rows:
+        try:
+            created_at = int(datetime.fromisoformat(row["created_at"]).timestamp())
+            expires_at = int(datetime.fromisoformat(row["expires_at"]).timestamp())
+        except (TypeError, ValueError):
+            continue
+        if expires_at > now:
+            converted.append((row["id"], row["user_id"], row["token_hash"], created_at, expires_at))
+    conn.executemany(
+        "INSERT INTO sessions_new (id, user_id, token_hash, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        converted,
+    )
+    conn.execute("DROP TABLE sessions")
+    conn.execute("ALTER TABLE sessions_new RENAME TO sessions")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+
+
+def _session_generation(conn: sqlite3.Connection) -> None:
+    # Bumped to revoke every signed token a user holds.
+    conn.execute("ALTER TABLE users ADD COLUMN session_generation INTEGER NOT NULL DEFAULT 0")
+
+
+# Schema history of the auth database; append new steps, never edit applied ones.
+MIGRATIONS = [_create_schema, _epoch_session_expiry, _session_generation]
+
+SIGNED_TOKEN_PREFIX = "v1."
+
+
+class AuthError(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    """
+    Counts failed logins per client IP and per username over a sliding window.
+
+    Once either key reaches ``max_attempts`` failures inside ``window_seconds``, further
+    attempts for it are refused without checking the password, so a brute-force run cannot
+    keep the hashing pool busy. A successful login only clears its username key; clearing
+    the IP key too would let an attacker reset their counter by logging into their own
+    account between guesses.
+    """
+
+    def __init__(self, max_attempts: int, window_seconds: int) -> None:
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._failures: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def check(self, keys: list[str]) -> None:
+        if self.max_attempts <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                failures = self._prune(key, now)
+                if len(failures) >= self.max_attempts:
+                    retry_after = int(failures[0] + self.window_seconds - now) + 1
+                    raise AuthError(429, "Too many failed login attempts; try again later", retry_after)
+
+    def failed(self, keys: list[str]) -> None:
+        if self.max_attempts <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._failures[key] = self._prune(key, now) + [now]
+            # Keep memory bounded when many distinct keys are probed.
+            if len(self._failures) > 10_000:
+                for key in list(self._failures):
+                    self._prune(key, now)
+
+    def succeeded(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
+
+    def _prune(self, key: str, now: float) -> list[float]:
+        cutoff = now - self.window_seconds
+        failures = [at for at in self._failures.get(key, []) if at > cutoff]
+        if failures:
+            self._failures[key] = failures
+        else:
+            self._failures.pop(key, None)
+        return failures
+
+
 @dataclass(frozen=True)
 class AuthUser:
     id: int
@@ -33,44 +177,47 @@ class AuthService:
         self.secret = secret or settings.auth_secret or secrets.token_hex(32)
         self.cookie_name = cookie_name or settings.auth_cookie_name
         self.session_ttl_hours = session_ttl_hours or settings.session_ttl_hours
+        self._pool = SqlitePool(self.db_path, size=settings.auth_db_pool_size)
+        self.pbkdf2_iterations = settings.auth_pbkdf2_iterations
+        # PBKDF2 holds a core for hundreds of milliseconds; run it on a few dedicated threads
+        # (hashlib releases the GIL) and refuse work beyond a bounded backlog.
+        self._hash_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.auth_hash_workers), thread_name_prefix="pbkdf2"
+        )
+        self._hash_slots = threading.BoundedSemaphore(
+            max(1, settings.auth_hash_workers) + max(0, settings.auth_hash_max_pending)
+        )
+        self._sweeper_started = False
+        self.login_throttle = LoginThrottle(
+            settings.auth_login_max_attempts, settings.auth_login_window_seconds
+        )
+        # token hash -> (user, monotonic deadline). A deadline never passes the session's own
+        # expiry, so an expired session always falls through to the database.
+        self._session_cache: OrderedDict[str, tuple[AuthUser, float]] = OrderedDict()
+        self._session_cache_lock = threading.Lock()
+        self.session_cache_ttl_seconds = settings.session_cache_ttl_seconds
+        self.session_cache_max_entries = settings.session_cache_max_entries
+        # Signed tokens carry the user's session generation; user id -> (generation, monotonic
+        # time read). Other workers' bumps are picked up once an entry is older than the TTL.
+        self.stateless_tokens = settings.auth_stateless_tokens
+        self.generation_ttl_seconds = settings.auth_generation_ttl_seconds
+        self._generations: dict[int, tuple[int, float]] = {}
+        self._generations_lock = threading.Lock()
 
         if not settings.auth_secret:
             logger.warning(
                 "AUTH_SECRET is not set; sessions will reset on restart. Set AUTH_SECRET to persist sessions."
             )
+        if self.stateless_tokens and not (secret or settings.auth_secret):
+            # A random per-process key would make every other worker reject the tokens.
+            logger.error(
+                "AUTH_STATELESS_TOKENS requires AUTH_SECRET shared by all workers; "
+                "falling back to database sessions."
+            )
+            self.stateless_tokens = False
 
     def init_db(self) -> None:
-        auth_dir = os.path.dirname(self.db_path)
-        if auth_dir:
-            os.makedirs(auth_dir, exist_ok=True)
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    token_hash TEXT UNIQUE NOT NULL,
-                    created_at TEXT NOT NULL,
-                    expires_at TEXT NOT NULL,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-                """
-            )
-            conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_sessions_token_hash ON sessions(token_hash)"
-            )
-            conn.execute("PRAGMA foreign_keys = ON")
+        self._pool.migrate(MIGRATIONS)
 
     def ensure_owner_bootstrap(self) -> None:
         with self._connect() as conn:
@@ -113,21 +260,57 @@ class AuthService:
         else:
             logger.info("Owner account created from generated bootstrap credentials.")
 
-    def authenticate(self, username: str, password: str) -> Optional[AuthUser]:
+    async def authenticate(
+        self, username: str, password: str, client_ip: Optional[str] = None
+    ) -> Optional[AuthUser]:
         username = username.strip().lower()
         if not username or not password:
             return None
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT id, username, password_hash, role FROM users WHERE username = ?",
-                (username,),
-            ).fetchone()
+        user_key = f"user:{username}"
+        throttle_keys = [user_key] + ([f"ip:{client_ip}"] if client_ip else [])
+        self.login_throttle.check(throttle_keys)
+        user = await self._authenticate(username, password)
+        if user is None:
+            self.login_throttle.failed(throttle_keys)
+        else:
+            self.login_throttle.succeeded([user_key])
+        return user
+
+    async def _authenticate(self, username: str, password: str) -> Optional[AuthUser]:
+        # Database calls go to the threadpool and hashing to the PBKDF2 pool; nothing here
+        # holds a worker thread while waiting on the other.
+        row = await asyncio.to_thread(self._find_user, username)
         if not row:
             return None
-        if not self._verify_password(row["password_hash"], password):
+        parsed = self._parse_hash(row["password_hash"])
+        if parsed is None:
+            return None
+        iterations, salt, expected = parsed
+        derived = await self._pbkdf2_async(password, salt, iterations)
+        if not hmac.compare_digest(expected, derived):
             return None
+        if self._needs_rehash(row["password_hash"]):
+            # Cost settings changed since this hash was made; the plaintext is at hand now.
+            salt = secrets.token_bytes(16)
+            dk = await self._pbkdf2_async(password, salt, self.pbkdf2_iterations)
+            password_hash = self._format_hash(self.pbkdf2_iterations, salt, dk)
+            await asyncio.to_thread(self._replace_hash, row["id"], row["password_hash"], password_hash)
         return AuthUser(id=row["id"], username=row["username"], role=row["role"])
 
+    def _find_user(self, username: str) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT id, username, password_hash, role FROM users WHERE username = ?",
+                (username,),
+            ).fetchone()
+
+    def _replace_hash(self, user_id: int, old_hash: str, new_hash: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                (new_hash, user_id, old_hash),
+            )
+
     def create_user(self, username: str, password: str, role: str) -> AuthUser:
         username = username.strip().lower()
         if not username or not password:
@@ -160,29 +343,44 @@ class AuthService:
         return [AuthUser(id=row["id"], username=row["username"], role=row["role"]) for row in rows]
 
     def create_session(self, user_id: int) -> tuple[str, datetime]:
-        token = secrets.token_urlsafe(32)
-        token_hash = self._hash_token(token)
         now = self._now()
         expires = now + timedelta(hours=self.session_ttl_hours)
+        if self.stateless_tokens:
+            return self._create_signed_token(user_id, expires), expires
+        token = secrets.token_urlsafe(32)
+        token_hash = self._hash_token(token)
         with self._connect() as conn:
             conn.execute(
                 """
                 INSERT INTO sessions (user_id, token_hash, created_at, expires_at)
                 VALUES (?, ?, ?, ?)
                 """,
-                (user_id, token_hash, now.isoformat(), expires.isoformat()),
+                (user_id, token_hash, int(now.timestamp()), int(expires.timestamp())),
             )
         return token, expires
 
     def delete_session(self, token: str) -> None:
+        if token.startswith(SIGNED_TOKEN_PREFIX):
+            # A signed token cannot be deleted on its own; logging out revokes all of the
+            # user's signed tokens.
+            payload = self._decode_signed_token(token)
+            if payload is not None:
+                self.revoke_user_sessions(payload["uid"])
+            return
         token_hash = self._hash_token(token)
+        self._forget_session(token_hash)
         with self._connect() as conn:
             conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
 
     def get_user_by_session(self, token: str) -> Optional[AuthUser]:
         if not token:
             return None
+        if token.startswith(SIGNED_TOKEN_PREFIX):
+            return self._user_from_signed_token(token, allow_io=True) if self.stateless_tokens else None
         token_hash = self._hash_token(token)
+        cached = self._cached_session(token_hash)
+        if cached is not None:
+            return cached
         with self._connect() as conn:
             row = conn.execute(
                 """
@@ -195,11 +393,54 @@ class AuthService:
             ).fetchone()
         if not row:
             return None
-        expires_at = datetime.fromisoformat(row["expires_at"])
-        if expires_at < self._now():
+        remaining = row["expires_at"] - time.time()
+        if remaining <= 0:
             self.delete_session(token)
             return None
-        return AuthUser(id=row["id"], username=row["username"], role=row["role"])
+        user = AuthUser(id=row["id"], username=row["username"], role=row["role"])
+        self._remember_session(token_hash, user, remaining)
+        return user
+
+    def purge_expired_sessions(self, batch_size: int = 500) -> int:
+        """
+        Deletes expired sessions in batches of ``batch_size`` rows and returns how many went.
+
+        Each batch is its own short transaction, so logins and lookups are never held up
+        behind one large delete.
+        """
+        removed = 0
+        while True:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?
+                    )
+                    """,
+                    (int(time.time()), batch_size),
+                )
+            removed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return removed
+
+    def start_session_sweeper(self) -> None:
+        interval = settings.session_sweep_interval_seconds
+        if interval <= 0 or self._sweeper_started:
+            return
+        self._sweeper_started = True
+
+        def loop() -> None:
+            while True:
+                try:
+                    removed = self.purge_expired_sessions()
+                    if removed:
+                        logger.info("Removed %s expired sessions", removed)
+                except Exception as exc:
+                    logger.warning("Session sweep failed: %s", exc)
+                time.sleep(interval)
+
+        t = threading.Thread(target=loop, daemon=True, name="session-sweeper")
+        t.start()
 
     def get_user_from_request(self, request) -> Optional[AuthUser]:
         token = request.cookies.get(self.cookie_name)
@@ -207,19 +448,136 @@ class AuthService:
             return None
         return self.get_user_by_session(token)
 
-    def _connect(self) -> sqlite3.Connection:
-        auth_dir = os.path.dirname(self.db_path)
-        if auth_dir:
-            os.makedirs(auth_dir, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+    def cached_user_from_request(self, request) -> Optional[AuthUser]:
+        """The request's user if its session is cached; never touches the database."""
+        token = request.cookies.get(self.cookie_name)
+        if not token:
+            return None
+        if token.startswith(SIGNED_TOKEN_PREFIX):
+            return self._user_from_signed_token(token, allow_io=False) if self.stateless_tokens else None
+        return self._cached_session(self._hash_token(token))
+
+    def revoke_user_sessions(self, user_id: int) -> None:
+        """Invalidates every session of ``user_id``; call after a password change or removal."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE users SET session_generation = session_generation + 1 WHERE id = ?",
+                (user_id,),
+            )
+            conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+        with self._generations_lock:
+            self._generations.pop(user_id, None)
+        self.invalidate_user(user_id)
+
+    def _create_signed_token(self, user_id: int, expires: datetime) -> str:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT username, role, session_generation FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+        if not row:
+            raise ValueError("Unknown user")
+        payload = {
+            "uid": user_id,
+            "usr": row["username"],
+            "role": row["role"],
+            "exp": int(expires.timestamp()),
+            "gen": row["session_generation"],
+        }
+        body = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii").rstrip("=")
+        return f"{SIGNED_TOKEN_PREFIX}{body}.{self._sign(body)}"
+
+    def _decode_signed_token(self, token: str) -> Optional[dict]:
+        try:
+            body, signature = token[len(SIGNED_TOKEN_PREFIX) :].split(".", 1)
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(body)):
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+            if not isinstance(payload, dict):
+                return None
+            payload["uid"] = int(payload["uid"])
+            payload["exp"] = int(payload["exp"])
+            payload["gen"] = int(payload["gen"])
+        except (ValueError, KeyError, TypeError, base64.binascii.Error):
+            return None
+        return payload
+
+    def _user_from_signed_token(self, token: str, allow_io: bool) -> Optional[AuthUser]:
+        payload = self._decode_signed_token(token)
+        if payload is None or payload["exp"] <= time.time():
+            return None
+        generation = self._generation(payload["uid"], allow_io)
+        if generation is None or generation != payload["gen"]:
+            return None
+        return AuthUser(id=payload["uid"], username=str(payload.get("usr")), role=str(payload.get("role")))
+
+    def _generation(self, user_id: int, allow_io: bool) -> Optional[int]:
+        with self._generations_lock:
+            entry = self._generations.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] < self.generation_ttl_seconds:
+            return entry[0]
+        if not allow_io:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT session_generation FROM users WHERE id = ?", (user_id,)).fetchone()
+        if not row:
+            return None
+        with self._generations_lock:
+            self._generations[user_id] = (row["session_generation"], time.monotonic())
+        return row["session_generation"]
+
+    def _sign(self, body: str) -> str:
+        digest = hmac.new(self.secret.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drops every cached session of ``user_id``; call after changing or removing the user."""
+        with self._session_cache_lock:
+            for token_hash in [key for key, (user, _) in self._session_cache.items() if user.id == user_id]:
+                del self._session_cache[token_hash]
+
+    def _cached_session(self, token_hash: str) -> Optional[AuthUser]:
+        with self._session_cache_lock:
+            entry = self._session_cache.get(token_hash)
+            if entry is None:
+                return None
+            user, deadline = entry
+            if deadline <= time.monotonic():
+                del self._session_cache[token_hash]
+                return None
+            self._session_cache.move_to_end(token_hash)
+            return user
+
+    def _remember_session(self, token_hash: str, user: AuthUser, remaining_seconds: float) -> None:
+        if self.session_cache_max_entries <= 0:
+            return
+        ttl = min(self.session_cache_ttl_seconds, remaining_seconds)
+        if ttl <= 0:
+            return
+        with self._session_cache_lock:
+            self._session_cache[token_hash] = (user, time.monotonic() + ttl)
+            self._session_cache.move_to_end(token_hash)
+            while len(self._session_cache) > self.session_cache_max_entries:
+                self._session_cache.popitem(last=False)
+
+    def _forget_session(self, token_hash: str) -> None:
+        with self._session_cache_lock:
+            self._session_cache.pop(token_hash, None)
+
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        return self._pool.connection()
 
     def _hash_password(self, password: str, salt: Optional[bytes] = None) -> str:
         salt = salt or secrets.token_bytes(16)
-        iterations = 200_000
-        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        iterations = self.pbkdf2_iterations
+        dk = self._pbkdf2(password, salt, iterations)
+        return self._format_hash(iterations, salt, dk)
+
+    def _format_hash(self, iterations: int, salt: bytes, dk: bytes) -> str:
         return "$".join(
             [
                 "pbkdf2_sha256",
@@ -229,20 +587,41 @@ class AuthService:
             ]
         )
 
-    def _verify_password(self, stored: str, password: str) -> bool:
+    def _parse_hash(self, stored: str) -> Optional[tuple[int, bytes, bytes]]:
         try:
             algorithm, iterations_str, salt_b64, hash_b64 = stored.split("$", 3)
             if algorithm != "pbkdf2_sha256":
-                return False
-            iterations = int(iterations_str)
-            salt = base64.b64decode(salt_b64)
-            expected = base64.b64decode(hash_b64)
+                return None
+            return int(iterations_str), base64.b64decode(salt_b64), base64.b64decode(hash_b64)
         except (ValueError, base64.binascii.Error):
-            return False
-        derived = hashlib.pbkdf2_hmac(
-            "sha256", password.encode("utf-8"), salt, iterations
-        )
-        return hmac.compare_digest(expected, derived)
+            return None
+
+    def _needs_rehash(self, stored: str) -> bool:
+        algorithm, _, rest = stored.partition("$")
+        iterations_str = rest.partition("$")[0]
+        return algorithm != "pbkdf2_sha256" or iterations_str != str(self.pbkdf2_iterations)
+
+    def _pbkdf2(self, password: str, salt: bytes, iterations: int) -> bytes:
+        if not self._hash_slots.acquire(blocking=False):
+            raise AuthError(503, "Too many logins in progress; try again shortly", retry_after=1)
+        try:
+            return self._hash_pool.submit(
+                hashlib.pbkdf2_hmac, "sha256", password.encode("utf-8"), salt, iterations
+            ).result()
+        finally:
+            self._hash_slots.release()
+
+    async def _pbkdf2_async(self, password: str, salt: bytes, iterations: int) -> bytes:
+        if not self._hash_slots.acquire(blocking=False):
+            raise AuthError(503, "Too many logins in progress; try again shortly", retry_after=1)
+        try:
+            return await asyncio.wrap_future(
+                self._hash_pool.submit(
+                    hashlib.pbkdf2_hmac, "sha256", password.encode("utf-8"), salt, iterations
+                )
+            )
+        finally:
+            self._hash_slots.release()
 
     def _hash_token(self, token: str) -> str:
         return hmac.new(self.secret.encode("utf-8"), token.encode("utf-8"), hashlib.sha256).hexdigest()
@@ -35,6 +35,8 @@ class Settings:
     host_data_root: str
     minecraft_image: str
     modrinth_base_url: str
+    modrinth_cache_ttl_seconds: int
+    modrinth_cache_max_entries: int
     port_range_start: int
     port_range_end: int
     default_memory_mb: int
@@ -46,18 +48,49 @@ class Settings:
     auth_cookie_name: str
     auth_cookie_secure: bool
     session_ttl_hours: int
+    session_cache_ttl_seconds: int
+    session_cache_max_entries: int
+    session_sweep_interval_seconds: int
+    auth_stateless_tokens: bool
+    auth_generation_ttl_seconds: int
     owner_username: str | None
     owner_password: str | None
     auth_db_path: str
+    auth_db_pool_size: int
+    auth_pbkdf2_iterations: int
+    auth_hash_workers: int
+    auth_hash_max_pending: int
+    auth_login_max_attempts: int
+    auth_login_window_seconds: int
     auto_dns_enabled: bool
     mc_parent_domain: str
     cf_api_token: str
     cf_zone_id: str | None
     cf_zone_name: str | None
     dns_reconcile_interval_seconds: int
+    dns_debounce_seconds: int
+    cf_rate_limit_per_minute: int
+    cf_rate_limit_burst: int
+    cf_max_retries: int
+    cf_interactive_wait_seconds: int
+    dns_instance_id: str | None
     autopause_enabled: bool
     autopause_timeout_seconds: int
     autopause_period_seconds: int
+    job_max_concurrency: int
+    job_max_pending: int
+    log_buffer_lines: int
+    log_subscriber_queue: int
+    rcon_native_enabled: bool
+    rcon_timeout_seconds: int
+    rcon_idle_seconds: int
+    status_probe_interval_seconds: int
+    status_probe_timeout_seconds: int
+    status_probe_concurrency: int
+    status_probe_host: str | None
+    server_ready_timeout_seconds: int
+    modpack_download_workers: int
+    download_retries: int
 
 
 
@@ -65,12 +98,15 @@ def load_settings() -> Settings:
     data_root = os.path.abspath(os.getenv("DATA_ROOT", "/data/minecraft"))
     host_data_root_env = os.getenv("HOST_DATA_ROOT")
     host_data_root = os.path.abspath(host_data_root_env) if host_data_root_env else data_root
+    autopause_enabled = _get_env_bool("AUTOPAUSE_ENABLED", True)
     return Settings(
         docker_base_url=os.getenv("DOCKER_BASE_URL", "unix://var/run/docker.sock"),
         data_root=data_root,
         host_data_root=host_data_root,
         minecraft_image=os.getenv("MINECRAFT_IMAGE", "itzg/minecraft-server"),
         modrinth_base_url=os.getenv("MODRINTH_BASE_URL", "https://api.modrinth.com/v2"),
+        modrinth_cache_ttl_seconds=_get_env_int("MODRINTH_CACHE_TTL_SECONDS", 300),
+        modrinth_cache_max_entries=_get_env_int("MODRINTH_CACHE_MAX_ENTRIES", 1024),
         port_range_start=_get_env_int("PORT_RANGE_START", 25565),
         port_range_end=_get_env_int("PORT_RANGE_END", 25665),
         default_memory_mb=_get_env_int("DEFAULT_MEMORY_MB", 2048),
@@ -82,18 +118,51 @@ def load_settings() -> Settings:
         auth_cookie_name=os.getenv("AUTH_COOKIE_NAME", "mcserver_session"),
         auth_cookie_secure=_get_env_bool("AUTH_COOKIE_SECURE", False),
         session_ttl_hours=_get_env_int("SESSION_TTL_HOURS", 24),
+        session_cache_ttl_seconds=_get_env_int("SESSION_CACHE_TTL_SECONDS", 300),
+        session_cache_max_entries=_get_env_int("SESSION_CACHE_MAX_ENTRIES", 1024),
+        session_sweep_interval_seconds=_get_env_int("SESSION_SWEEP_INTERVAL_SECONDS", 3600),
+        auth_stateless_tokens=_get_env_bool("AUTH_STATELESS_TOKENS", False),
+        auth_generation_ttl_seconds=_get_env_int("AUTH_GENERATION_TTL_SECONDS", 30),
         owner_username=os.getenv("OWNER_USERNAME") or None,
         owner_password=os.getenv("OWNER_PASSWORD") or None,
         auth_db_path=os.path.join(data_root, "_auth", "auth.db"),
+        auth_db_pool_size=_get_env_int("AUTH_DB_POOL_SIZE", 8),
+        auth_pbkdf2_iterations=_get_env_int("AUTH_PBKDF2_ITERATIONS", 200_000),
+        auth_hash_workers=_get_env_int("AUTH_HASH_WORKERS", 2),
+        auth_hash_max_pending=_get_env_int("AUTH_HASH_MAX_PENDING", 16),
+        auth_login_max_attempts=_get_env_int("AUTH_LOGIN_MAX_ATTEMPTS", 10),
+        auth_login_window_seconds=_get_env_int("AUTH_LOGIN_WINDOW_SECONDS", 300),
                 auto_dns_enabled=_get_env_bool("AUTO_DNS_ENABLED", False),
         mc_parent_domain=os.getenv("MC_PARENT_DOMAIN", "minecraft.johngov.co.uk"),
         cf_api_token=os.getenv("CF_API_TOKEN", ""),
         cf_zone_id=os.getenv("CF_ZONE_ID") or None,
         cf_zone_name=os.getenv("CF_ZONE_NAME") or None,
-        dns_reconcile_interval_seconds=_get_env_int("DNS_RECONCILE_INTERVAL_SECONDS", 60),
-        autopause_enabled=_get_env_bool("AUTOPAUSE_ENABLED", True),
+        dns_reconcile_interval_seconds=_get_env_int("DNS_RECONCILE_INTERVAL_SECONDS", 900),
+        dns_debounce_seconds=_get_env_int("DNS_DEBOUNCE_SECONDS", 2),
+        cf_rate_limit_per_minute=_get_env_int("CF_RATE_LIMIT_PER_MINUTE", 200),
+        cf_rate_limit_burst=_get_env_int("CF_RATE_LIMIT_BURST", 20),
+        cf_max_retries=_get_env_int("CF_MAX_RETRIES", 4),
+        cf_interactive_wait_seconds=_get_env_int("CF_INTERACTIVE_WAIT_SECONDS", 5),
+        dns_instance_id=os.getenv("DNS_INSTANCE_ID") or None,
+        autopause_enabled=autopause_enabled,
         autopause_timeout_seconds=_get_env_int("AUTOPAUSE_TIMEOUT_SECONDS", 300),
         autopause_period_seconds=_get_env_int("AUTOPAUSE_PERIOD_SECONDS", 10),
+        job_max_concurrency=_get_env_int("JOB_MAX_CONCURRENCY", 2),
+        job_max_pending=_get_env_int("JOB_MAX_PENDING", 32),
+        log_buffer_lines=_get_env_int("LOG_BUFFER_LINES", 1000),
+        log_subscriber_queue=_get_env_int("LOG_SUBSCRIBER_QUEUE", 256),
+        rcon_native_enabled=_get_env_bool("RCON_NATIVE_ENABLED", True),
+        rcon_timeout_seconds=_get_env_int("RCON_TIMEOUT_SECONDS", 10),
+        rcon_idle_seconds=_get_env_int("RCON_IDLE_SECONDS", 300),
+        status_probe_interval_seconds=_get_env_int(
+            "STATUS_PROBE_INTERVAL_SECONDS", 0 if autopause_enabled else 15
+        ),
+        status_probe_timeout_seconds=_get_env_int("STATUS_PROBE_TIMEOUT_SECONDS", 3),
+        status_probe_concurrency=_get_env_int("STATUS_PROBE_CONCURRENCY", 16),
+        status_probe_host=os.getenv("STATUS_PROBE_HOST") or None,
+        server_ready_timeout_seconds=_get_env_int("SERVER_READY_TIMEOUT_SECONDS", 300),
+        modpack_download_workers=_get_env_int("MODPACK_DOWNLOAD_WORKERS", 8),
+        download_retries=_get_env_int("DOWNLOAD_RETRIES", 3),
     )
 
 
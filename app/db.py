@@ -0,0 +1,134 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+class SqlitePool:
+    """
+    A fixed-size pool of SQLite connections to one database file in WAL mode.
+
+    WAL lets readers run alongside the single writer instead of queueing on the file lock,
+    and ``synchronous=NORMAL`` only syncs at checkpoints, which is durable across application
+    crashes (a power loss may drop the last few commits). Connections are created lazily up
+    to ``size`` and handed to one thread at a time.
+    """
+
+    def __init__(self, path: str, size: int = 8, busy_timeout_ms: int = 5000) -> None:
+        self.path = path
+        self.size = max(1, size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def migrate(self, migrations: list[Migration]) -> None:
+        """
+        Applies the migrations the database has not seen yet, tracked in ``user_version``.
+
+        ``migrations[n]`` moves the schema from version n to n + 1 and runs in its own
+        ``BEGIN IMMEDIATE`` transaction together with the version bump, so a failure rolls
+        back its DDL and leaves the database at version n. Call once at startup, before
+        serving requests.
+        """
+        conn = self._acquire()
+        try:
+            while True:
+                with self._transaction(conn, "BEGIN IMMEDIATE"):
+                    # Re-read under the write lock in case another process migrated first.
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version >= len(migrations):
+                        break
+                    migrations[version](conn)
+                    conn.execute(f"PRAGMA user_version = {version + 1}")
+                logger.info("Migrated %s to schema version %s", os.path.basename(self.path), version + 1)
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection; the block commits on success and rolls back on error."""
+        conn = self._acquire()
+        try:
+            with self._transaction(conn, "BEGIN"):
+                yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self._created -= 1
+            conn.close()
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection, begin: str) -> Iterator[None]:
+        # Connections run in autocommit mode so transactions, DDL included, are explicit.
+        conn.execute(begin)
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            # Also covers a failed COMMIT (busy, disk error): never hand back an open transaction.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if not conn.in_transaction:
+            self._idle.put(conn)
+            return
+        # Rollback failed too; the next borrower's BEGIN would fail on this connection.
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return conn
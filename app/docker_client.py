@@ -1,9 +1,21 @@
+import logging
+import struct
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+
 import docker
-from docker.errors import DockerException
+import httpx
+from docker.errors import DockerException, NotFound
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 _docker_client: docker.DockerClient | None = None
+_async_docker_client: "AsyncDockerClient | None" = None
+
+InventoryListener = Callable[[str, str, Optional[Any]], None]
 
 
 def get_docker_client() -> docker.DockerClient:
@@ -24,3 +36,469 @@ def get_docker_client() -> docker.DockerClient:
         raise DockerException(str(exc)) from exc
     _docker_client = client
     return client
+
+
+def get_async_docker_client() -> "AsyncDockerClient":
+    """
+    Lazily creates the asyncio Docker client used by the hot request paths.
+
+    Same lifecycle as ``get_docker_client``: construction failures surface as
+    ``DockerException`` so routes can answer 503 instead of failing at import time.
+    """
+    global _async_docker_client
+    if _async_docker_client is not None:
+        return _async_docker_client
+    client = AsyncDockerClient(settings.docker_base_url)
+    _async_docker_client = client
+    return client
+
+
+class AsyncDockerError(DockerException):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class AsyncDockerClient:
+    """
+    Minimal asyncio client for the Docker Engine API, spoken over httpx.
+
+    Covers the calls that used to park a threadpool worker for seconds at a time: container
+    start/stop/restart, log reads and follows, and exec. Everything else keeps using
+    docker-py through ``get_docker_client``.
+    """
+
+    def __init__(self, base_url: str, timeout_seconds: float = 30.0) -> None:
+        transport: httpx.AsyncHTTPTransport | None = None
+        if base_url.startswith("unix://"):
+            socket_path = "/" + base_url[len("unix://") :].lstrip("/")
+            transport = httpx.AsyncHTTPTransport(uds=socket_path)
+            api_base = "http://docker"
+        elif base_url.startswith(("tcp://", "http://", "https://")):
+            api_base = "http://" + base_url[len("tcp://") :] if base_url.startswith("tcp://") else base_url
+        else:
+            raise DockerException(f"Unsupported DOCKER_BASE_URL for async access: {base_url}")
+        self.timeout_seconds = timeout_seconds
+        self._client = httpx.AsyncClient(
+            base_url=api_base.rstrip("/"),
+            transport=transport,
+            timeout=httpx.Timeout(timeout_seconds),
+        )
+
+    async def inspect_container(self, container_id: str) -> dict[str, Any]:
+        response = await self._request("GET", f"/containers/{container_id}/json")
+        return response.json()
+
+    async def start(self, container_id: str) -> None:
+        await self._request("POST", f"/containers/{container_id}/start")
+
+    async def stop(self, container_id: str, timeout: int = 10) -> None:
+        await self._request(
+            "POST",
+            f"/containers/{container_id}/stop",
+            params={"t": timeout},
+            timeout=timeout + self.timeout_seconds,
+        )
+
+    async def restart(self, container_id: str, timeout: int = 10) -> None:
+        await self._request(
+            "POST",
+            f"/containers/{container_id}/restart",
+            params={"t": timeout},
+            timeout=timeout + self.timeout_seconds,
+        )
+
+    async def logs(
+        self, container_id: str, tail: Optional[int], tty: bool = False, timestamps: bool = False
+    ) -> bytes:
+        params = self._log_params(follow=False, tail=tail, timestamps=timestamps)
+        response = await self._request("GET", f"/containers/{container_id}/logs", params=params)
+        if tty:
+            return response.content
+        return b"".join(self._demux_frames(bytearray(response.content)))
+
+    async def follow_logs(
+        self,
+        container_id: str,
+        tail: Optional[int],
+        tty: bool = False,
+        since: Optional[float] = None,
+        timestamps: bool = False,
+    ) -> AsyncIterator[bytes]:
+        params = self._log_params(follow=True, tail=tail, since=since, timestamps=timestamps)
+        request = self._client.build_request(
+            "GET",
+            f"/containers/{container_id}/logs",
+            params=params,
+            timeout=httpx.Timeout(self.timeout_seconds, read=None),
+        )
+        try:
+            response = await self._client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            raise AsyncDockerError(503, f"Docker request failed: {exc}") from exc
+        try:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise AsyncDockerError(response.status_code, self._error_message(response, body))
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                if tty:
+                    yield chunk
+                    continue
+                buffer.extend(chunk)
+                for payload in self._demux_frames(buffer):
+                    yield payload
+        finally:
+            await response.aclose()
+
+    async def exec_run(self, container_id: str, cmd: list[str]) -> tuple[int, bytes]:
+        created = await self._request(
+            "POST",
+            f"/containers/{container_id}/exec",
+            json={"AttachStdout": True, "AttachStderr": True, "Cmd": cmd},
+        )
+        exec_id = created.json()["Id"]
+        started = await self._request(
+            "POST", f"/exec/{exec_id}/start", json={"Detach": False, "Tty": False}
+        )
+        output = b"".join(self._demux_frames(bytearray(started.content)))
+        inspected = await self._request("GET", f"/exec/{exec_id}/json")
+        exit_code = inspected.json().get("ExitCode")
+        return (exit_code if isinstance(exit_code, int) else -1), output
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        try:
+            response = await self._client.request(
+                method,
+                path,
+                params=params,
+                json=json,
+                timeout=httpx.Timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+        except httpx.HTTPError as exc:
+            raise AsyncDockerError(503, f"Docker request failed: {exc}") from exc
+        if response.status_code >= 400:
+            raise AsyncDockerError(response.status_code, self._error_message(response, response.content))
+        return response
+
+    def _log_params(
+        self,
+        follow: bool,
+        tail: Optional[int],
+        since: Optional[float] = None,
+        timestamps: bool = False,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"stdout": 1, "stderr": 1, "follow": 1 if follow else 0}
+        params["tail"] = str(tail) if tail is not None else "all"
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+        if timestamps:
+            params["timestamps"] = 1
+        return params
+
+    def _demux_frames(self, buffer: bytearray) -> list[bytes]:
+        """
+        Splits Docker's multiplexed stdout/stderr framing, consuming complete frames from ``buffer``.
+
+        Each frame is an 8-byte header (stream type, 3 padding bytes, big-endian length)
+        followed by the payload. A trailing partial frame is left in the buffer.
+        """
+        payloads: list[bytes] = []
+        while len(buffer) >= 8:
+            (length,) = struct.unpack(">I", buffer[4:8])
+            if len(buffer) < 8 + length:
+                break
+            payloads.append(bytes(buffer[8 : 8 + length]))
+            del buffer[: 8 + length]
+        return payloads
+
+    def _error_message(self, response: httpx.Response, body: bytes) -> str:
+        try:
+            detail = response.json().get("message") if body else None
+        except ValueError:
+            detail = None
+        return detail or body.decode("utf-8", errors="replace") or f"HTTP {response.status_code}"
+
+
+class ContainerInventory:
+    """
+    Long-lived, in-memory view of the managed containers, keyed by ``mc.server_id``.
+
+    One label-filtered ``/containers/json`` listing seeds the inventory with container
+    summaries, then the Docker events stream keeps it current. Full inspect data is fetched
+    lazily per container and dropped whenever an event touches it. While the stream is down
+    (Docker restarting, socket hiccup) lookups fall back to a fresh listing per call, and the
+    watcher thread resyncs as soon as it reconnects.
+
+    Image tags are cached by image id as well, so rendering many containers built from the
+    same image costs one image inspect rather than one per container.
+    """
+
+    WATCHED_ACTIONS = {
+        "create",
+        "start",
+        "restart",
+        "stop",
+        "die",
+        "kill",
+        "pause",
+        "unpause",
+        "rename",
+        "update",
+        "destroy",
+    }
+    IMAGE_ACTIONS = {"pull", "tag", "untag", "delete", "import", "load"}
+
+    def __init__(self, label: str, value: str, reconnect_delay_seconds: float = 5.0) -> None:
+        self.label = label
+        self.label_value = value
+        self.label_filter = f"{label}={value}"
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._lock = threading.RLock()
+        self._summaries: dict[str, dict[str, Any]] = {}
+        self._containers: dict[str, Any] = {}
+        self._server_index: dict[str, str] = {}
+        self._image_tags: dict[str, list[str]] = {}
+        self._listeners: list[InventoryListener] = []
+        self._live = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def live(self) -> bool:
+        return self._live
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._watch_loop, daemon=True, name="container-inventory"
+        )
+        self._thread.start()
+        logger.info("Container inventory watcher started (%s)", self.label_filter)
+
+    def subscribe(self, listener: InventoryListener) -> None:
+        """
+        Registers ``listener(action, container_id, summary)`` for every applied change.
+
+        ``summary`` is the container's ``/containers/json`` entry, or None when the container
+        is gone. Listeners run on the watcher thread and must not block.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def summaries(self) -> list[dict[str, Any]]:
+        if not self._live:
+            self.resync()
+        with self._lock:
+            return list(self._summaries.values())
+
+    def summary(self, container_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._summaries.get(container_id)
+
+    def get(self, server_id: str):
+        """Returns the full docker-py container for ``server_id``, inspecting it at most once per change."""
+        if not self._live:
+            self.resync()
+        with self._lock:
+            container_id = self._server_index.get(server_id)
+            if container_id is None:
+                return None
+            container = self._containers.get(container_id)
+        if container is not None:
+            return container
+        try:
+            container = get_docker_client().containers.get(container_id)
+        except NotFound:
+            self._drop(container_id)
+            return None
+        with self._lock:
+            if container_id in self._summaries:
+                self._containers[container_id] = container
+        return container
+
+    def track(self, container) -> None:
+        """Records a container the manager just created or recreated without waiting for its event."""
+        summary = self._refresh(container.id)
+        if summary is not None:
+            with self._lock:
+                self._containers[container.id] = container
+        self._notify("track", container.id, summary)
+
+    def forget(self, container_id: str) -> None:
+        self._drop(container_id)
+        self._notify("destroy", container_id, None)
+
+    def image_tags(self, image_id: str) -> list[str]:
+        if not image_id:
+            return []
+        with self._lock:
+            cached = self._image_tags.get(image_id)
+        if cached is not None:
+            return cached
+        try:
+            image = get_docker_client().images.get(image_id)
+        except DockerException:
+            return []
+        tags = list(image.tags or [])
+        with self._lock:
+            self._image_tags[image_id] = tags
+        return tags
+
+    def resync(self) -> None:
+        docker_client = get_docker_client()
+        summaries = docker_client.api.containers(all=True, filters={"label": self.label_filter})
+        with self._lock:
+            previous = self._summaries
+            self._summaries = {}
+            self._server_index = {}
+            for summary in summaries:
+                self._store(summary)
+            # Keep inspect data only for containers whose summary did not move on.
+            self._containers = {
+                container_id: container
+                for container_id, container in self._containers.items()
+                if container_id in self._summaries
+                and self._summary_key(previous.get(container_id))
+                == self._summary_key(self._summaries[container_id])
+            }
+
+    def image_tags_warm(self) -> bool:
+        """True when every tracked container's image tags are cached (no Docker call needed)."""
+        with self._lock:
+            return all(
+                (summary.get("ImageID") or "") in self._image_tags or not summary.get("ImageID")
+                for summary in self._summaries.values()
+            )
+
+    def _warm_image_tags(self) -> None:
+        # Async routes render listings on the event loop; keep image inspects off that path.
+        with self._lock:
+            image_ids = {summary.get("ImageID") or "" for summary in self._summaries.values()}
+        for image_id in image_ids:
+            self.image_tags(image_id)
+
+    def _summary_key(self, summary: dict[str, Any] | None) -> tuple | None:
+        if summary is None:
+            return None
+        return (summary.get("State"), tuple(summary.get("Names") or ()), summary.get("ImageID"))
+
+    def _store(self, summary: dict[str, Any]) -> None:
+        container_id = summary.get("Id") or ""
+        if not container_id:
+            return
+        server_id = (summary.get("Labels") or {}).get("mc.server_id") or ""
+        with self._lock:
+            self._summaries[container_id] = summary
+            if server_id:
+                self._server_index[server_id] = container_id
+
+    def _drop(self, container_id: str) -> None:
+        with self._lock:
+            self._containers.pop(container_id, None)
+            summary = self._summaries.pop(container_id, None)
+            if summary is None:
+                return
+            server_id = (summary.get("Labels") or {}).get("mc.server_id") or ""
+            if server_id and self._server_index.get(server_id) == container_id:
+                self._server_index.pop(server_id, None)
+
+    def _refresh(self, container_id: str) -> dict[str, Any] | None:
+        summaries = get_docker_client().api.containers(
+            all=True, filters={"id": container_id, "label": self.label_filter}
+        )
+        summary = next((item for item in summaries if item.get("Id") == container_id), None)
+        with self._lock:
+            self._containers.pop(container_id, None)
+        if summary is None:
+            self._drop(container_id)
+            return None
+        self._store(summary)
+        return summary
+
+    def _notify(self, action: str, container_id: str, summary) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(action, container_id, summary)
+            except Exception:
+                logger.exception("Container inventory listener failed")
+
+    def _apply_event(self, event: dict[str, Any]) -> None:
+        event_type = event.get("Type")
+        action = str(event.get("Action") or "").split(":", 1)[0].strip()
+        actor = event.get("Actor") or {}
+        actor_id = actor.get("ID") or event.get("id") or ""
+
+        if event_type == "image":
+            if action not in self.IMAGE_ACTIONS:
+                return
+            with self._lock:
+                if action in {"tag", "untag", "delete"} and actor_id in self._image_tags:
+                    self._image_tags.pop(actor_id, None)
+                else:
+                    # Pulls are reported by reference rather than id; drop everything.
+                    self._image_tags.clear()
+            # Re-fill from this thread so listings on the event loop stay cache hits.
+            self._warm_image_tags()
+            return
+
+        if event_type != "container" or action not in self.WATCHED_ACTIONS:
+            return
+        attributes = actor.get("Attributes") or {}
+        if attributes.get(self.label) != self.label_value or not actor_id:
+            return
+        if action == "destroy":
+            self._drop(actor_id)
+            self._notify(action, actor_id, None)
+            return
+        summary = self._refresh(actor_id)
+        if summary is not None:
+            self.image_tags(summary.get("ImageID") or "")
+        self._notify(action, actor_id, summary)
+
+    def _watch_loop(self) -> None:
+        while True:
+            stream = None
+            try:
+                # Replay anything that happens while the initial listing is in flight.
+                since = int(time.time())
+                self.resync()
+                # Label filters would also drop image events, so managed containers are
+                # filtered by their event attributes instead.
+                stream = get_docker_client().events(
+                    decode=True,
+                    since=since,
+                    filters={"type": ["container", "image"]},
+                )
+                self._live = True
+                self._warm_image_tags()
+                self._notify("resync", "", None)
+                for event in stream:
+                    try:
+                        self._apply_event(event)
+                    except DockerException as exc:
+                        logger.warning("Container inventory refresh failed: %s", exc)
+                logger.warning("Docker event stream ended; resyncing container inventory")
+            except Exception as exc:
+                logger.warning("Container inventory watcher error: %s", exc)
+            finally:
+                self._live = False
+                if stream is not None:
+                    try:
+                        stream.close()
+                    except Exception:
+                        pass
+            time.sleep(self.reconnect_delay_seconds)
@@ -1,8 +1,10 @@
+import json
 import logging
 import os
-from typing import Optional
+from typing import Any, Optional
 
 from fastapi import FastAPI, File, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import (
     FileResponse,
     JSONResponse,
@@ -14,17 +16,26 @@ from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from .auth import AuthService, AuthUser
+from .auth import AuthError, AuthService, AuthUser
 from .config import settings
 from .models import (
     AuthResponse,
     CommandRequest,
+    CommandBatchRequest,
+    CommandBatchResponse,
     CommandResponse,
+    DnsRateLimitStats,
+    JarCacheGcResponse,
+    JarCacheStats,
+    JobInfo,
+    JobListResponse,
     LoginRequest,
+    ModrinthCacheStats,
     ServerActionResponse,
     ServerCreateRequest,
     ServerCreateResponse,
     ServerInfo,
+    ServerStatus,
     ServerSettings,
     ServerSettingsResponse,
     UserCreateRequest,
@@ -46,6 +57,7 @@ from .models import (
     ModpackSearchResponse,
     ModpackVersionResponse,
 )
+from .services.job_service import Job, JobError, JobManager
 from .services.minecraft_service import MinecraftService, ServiceError
 from .services.metadata_service import MetadataService
 from .services.modrinth_service import ModrinthError, ModrinthService
@@ -63,6 +75,10 @@ modrinth = ModrinthService()
 service = MinecraftService(modrinth=modrinth)
 metadata = MetadataService()
 auth_service = AuthService()
+jobs = JobManager(
+    max_concurrency=settings.job_max_concurrency,
+    max_pending=settings.job_max_pending,
+)
 base_dir = os.path.dirname(os.path.abspath(__file__))
 static_dir = os.path.join(base_dir, "static")
 templates_dir = os.path.join(base_dir, "templates")
@@ -97,17 +113,35 @@ def startup() -> None:
     except Exception:
         logger.exception("Owner bootstrap failed")
 
+    try:
+        auth_service.start_session_sweeper()
+    except Exception:
+        logger.exception("Session sweeper startup failed")
+
     try:
         ensure_branding_assets()
     except Exception:
         logger.exception("Branding asset init failed")
 
+    try:
+        service.inventory.start()
+    except Exception:
+        logger.exception("Container inventory startup failed")
+
     try:
         service.start_dns_reconciler()
     except Exception:
         logger.exception("DNS reconciler startup failed")
 
 
+@app.on_event("startup")
+async def start_status_prober() -> None:
+    try:
+        service.status.start()
+    except Exception:
+        logger.exception("Status prober startup failed")
+
+
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
     path = request.url.path
@@ -122,7 +156,9 @@ async def auth_middleware(request: Request, call_next):
     if path == "/theme/backgrounds" and request.method == "GET":
         return await call_next(request)
 
-    user = auth_service.get_user_from_request(request)
+    user = auth_service.cached_user_from_request(request)
+    if user is None and request.cookies.get(settings.auth_cookie_name):
+        user = await run_in_threadpool(auth_service.get_user_from_request, request)
     if not user:
         accepts = request.headers.get("accept", "")
         if path == "/" or "text/html" in accepts:
@@ -170,11 +206,14 @@ def theme_backgrounds() -> JSONResponse:
 
 
 @app.post("/auth/login", response_model=AuthResponse)
-def login(request: LoginRequest, response: Response) -> AuthResponse:
-    user = auth_service.authenticate(request.username, request.password)
+async def login(request: LoginRequest, response: Response, http_request: Request) -> AuthResponse:
+    # Behind a reverse proxy this is the proxy's address unless uvicorn trusts its
+    # X-Forwarded-For header (FORWARDED_ALLOW_IPS).
+    client_ip = http_request.client.host if http_request.client else None
+    user = await auth_service.authenticate(request.username, request.password, client_ip=client_ip)
     if not user:
         raise ServiceError(401, "Invalid credentials")
-    token, _ = auth_service.create_session(user.id)
+    token, _ = await run_in_threadpool(auth_service.create_session, user.id)
     max_age = settings.session_ttl_hours * 3600
     response.set_cookie(
         settings.auth_cookie_name,
@@ -229,11 +268,22 @@ def service_error_handler(request: Request, exc: ServiceError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+@app.exception_handler(AuthError)
+def auth_error_handler(request: Request, exc: AuthError) -> JSONResponse:
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message}, headers=headers)
+
+
 @app.exception_handler(ModrinthError)
 def modrinth_error_handler(request: Request, exc: ModrinthError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+@app.exception_handler(JobError)
+def job_error_handler(request: Request, exc: JobError) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 @app.exception_handler(BrandingError)
 def branding_error_handler(request: Request, exc: BrandingError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
@@ -306,29 +356,79 @@ def upload_branding_logo(request: Request, file: UploadFile = File(...)) -> JSON
     )
 
 
+def _job_accepted(job: Job) -> JSONResponse:
+    return JSONResponse(status_code=202, content=job.snapshot())
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @app.get("/servers", response_model=list[ServerInfo])
-def list_servers() -> list[ServerInfo]:
-    return service.list_servers()
+async def list_servers() -> list[ServerInfo]:
+    return await service.list_servers_async()
+
+
+@app.get("/servers/events")
+async def server_events() -> StreamingResponse:
+    async def stream():
+        async for event in service.events.events():
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(event["type"], event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/servers", response_model=ServerCreateResponse)
-def create_server(request: ServerCreateRequest) -> ServerCreateResponse:
-    return service.create_server(request)
+async def create_server(request: ServerCreateRequest, background: bool = Query(False)):
+    if background:
+        return _job_accepted(jobs.submit("create_server", None, service.create_server, request))
+    return await run_in_threadpool(service.create_server, request)
 
 
 @app.post("/servers/{server_id}/start", response_model=ServerActionResponse)
-def start_server(server_id: str) -> ServerActionResponse:
-    return service.start_server(server_id)
+async def start_server(
+    server_id: str,
+    wait: Optional[str] = Query(None, pattern="^ready$"),
+    timeout: Optional[int] = Query(None, ge=1, le=1800),
+    background: bool = Query(False),
+):
+    wait_ready = wait == "ready"
+    if background:
+        return _job_accepted(
+            jobs.submit(
+                "start", server_id, service.start_server, server_id, wait_ready, timeout
+            )
+        )
+    return await service.start_server(server_id, wait_ready, timeout)
 
 
 @app.post("/servers/{server_id}/stop", response_model=ServerActionResponse)
-def stop_server(server_id: str) -> ServerActionResponse:
-    return service.stop_server(server_id)
+async def stop_server(server_id: str) -> ServerActionResponse:
+    return await service.stop_server(server_id)
 
 
 @app.post("/servers/{server_id}/restart", response_model=ServerActionResponse)
-def restart_server(server_id: str) -> ServerActionResponse:
-    return service.restart_server(server_id)
+async def restart_server(
+    server_id: str,
+    wait: Optional[str] = Query(None, pattern="^ready$"),
+    timeout: Optional[int] = Query(None, ge=1, le=1800),
+    background: bool = Query(False),
+):
+    wait_ready = wait == "ready"
+    if background:
+        return _job_accepted(
+            jobs.submit(
+                "restart", server_id, service.restart_server, server_id, wait_ready, timeout
+            )
+        )
+    return await service.restart_server(server_id, wait_ready, timeout)
 
 
 @app.delete("/servers/{server_id}", response_model=ServerActionResponse)
@@ -339,24 +439,30 @@ def delete_server(
 
 
 @app.get("/servers/{server_id}/logs")
-def get_logs(
+async def get_logs(
     server_id: str,
     follow: bool = Query(False),
     tail: Optional[int] = Query(200, ge=0),
 ):
-    logs = service.get_logs(server_id, follow=follow, tail=tail)
+    logs = await service.get_logs(server_id, follow=follow, tail=tail)
     if follow:
         return StreamingResponse(logs, media_type="text/plain")
-    if isinstance(logs, bytes):
-        text = logs.decode("utf-8", errors="replace")
-    else:
-        text = b"".join(logs).decode("utf-8", errors="replace")
-    return PlainTextResponse(text)
+    return PlainTextResponse(logs.decode("utf-8", errors="replace"))
 
 
 @app.post("/servers/{server_id}/command", response_model=CommandResponse)
-def send_command(server_id: str, request: CommandRequest) -> CommandResponse:
-    return service.send_command(server_id, request)
+async def send_command(server_id: str, request: CommandRequest) -> CommandResponse:
+    return await service.send_command(server_id, request)
+
+
+@app.get("/servers/{server_id}/status", response_model=ServerStatus)
+async def get_server_status(server_id: str) -> ServerStatus:
+    return await service.get_status(server_id)
+
+
+@app.post("/servers/{server_id}/commands", response_model=CommandBatchResponse)
+async def send_commands(server_id: str, request: CommandBatchRequest) -> CommandBatchResponse:
+    return await service.send_commands(server_id, request)
 
 
 @app.get("/servers/{server_id}/settings", response_model=ServerSettingsResponse)
@@ -385,6 +491,58 @@ def update_whitelist(
     return service.update_whitelist(server_id, request)
 
 
+@app.get("/cache/jars", response_model=JarCacheStats)
+def jar_cache_stats(request: Request) -> JarCacheStats:
+    _require_owner(request)
+    return service.jar_cache_stats()
+
+
+@app.post("/cache/jars/gc", response_model=JarCacheGcResponse)
+def collect_jar_cache(request: Request) -> JarCacheGcResponse:
+    _require_owner(request)
+    return service.collect_jar_cache()
+
+
+@app.get("/dns/metrics", response_model=DnsRateLimitStats)
+def dns_metrics(request: Request) -> DnsRateLimitStats:
+    _require_owner(request)
+    return service.dns_rate_stats()
+
+
+@app.get("/cache/modrinth", response_model=ModrinthCacheStats)
+def modrinth_cache_stats(request: Request) -> ModrinthCacheStats:
+    _require_owner(request)
+    return ModrinthCacheStats(**modrinth.cache_stats())
+
+
+@app.get("/jobs", response_model=JobListResponse)
+def list_jobs(server_id: Optional[str] = Query(None)) -> JobListResponse:
+    return JobListResponse(jobs=[JobInfo(**job.snapshot()) for job in jobs.recent(server_id)])
+
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+def get_job(job_id: str) -> JobInfo:
+    return JobInfo(**jobs.get(job_id).snapshot())
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    jobs.get(job_id)
+
+    async def stream():
+        async for snapshot in jobs.events(job_id):
+            if snapshot is None:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse("job", snapshot)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/meta/minecraft/releases")
 def minecraft_releases() -> JSONResponse:
     try:
@@ -458,12 +616,17 @@ def list_mods(server_id: str) -> ModListResponse:
 
 
 @app.post("/servers/{server_id}/mods", response_model=ModInstallResponse)
-def install_mod(
+async def install_mod(
     server_id: str,
     request: ModInstallRequest,
     restart: bool = Query(False),
-) -> ModInstallResponse:
-    return service.install_mod(server_id, request, restart)
+    background: bool = Query(False),
+):
+    if background:
+        return _job_accepted(
+            jobs.submit("install_mod", server_id, service.install_mod, server_id, request, restart)
+        )
+    return await run_in_threadpool(service.install_mod, server_id, request, restart)
 
 @app.post("/servers/{server_id}/mods/upload", response_model=ModUploadResponse)
 def upload_mods(
@@ -475,12 +638,19 @@ def upload_mods(
     return service.upload_mods(server_id, files, restart=restart, overwrite=overwrite)
 
 @app.post("/servers/{server_id}/modpacks", response_model=ModpackInstallResponse)
-def install_modpack(
+async def install_modpack(
     server_id: str,
     request: ModpackInstallRequest,
     restart: bool = Query(False),
-) -> ModpackInstallResponse:
-    return service.install_modpack(server_id, request, restart)
+    background: bool = Query(False),
+):
+    if background:
+        return _job_accepted(
+            jobs.submit(
+                "install_modpack", server_id, service.install_modpack, server_id, request, restart
+            )
+        )
+    return await run_in_threadpool(service.install_modpack, server_id, request, restart)
 
 
 @app.delete("/servers/{server_id}/mods/{filename}", response_model=ModListResponse)
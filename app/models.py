@@ -26,6 +26,23 @@ class ServerInfo(BaseModel):
     server_type: Optional[str] = None
     modded: Optional[bool] = None
     memory_mb: Optional[int] = None
+    online: Optional[bool] = None
+    players_online: Optional[int] = None
+    players_max: Optional[int] = None
+    latency_ms: Optional[float] = None
+
+
+class ServerStatus(BaseModel):
+    server_id: str
+    online: bool
+    latency_ms: Optional[float] = None
+    players_online: Optional[int] = None
+    players_max: Optional[int] = None
+    motd: Optional[str] = None
+    version_name: Optional[str] = None
+    protocol: Optional[int] = None
+    checked_at: str
+    error: Optional[str] = None
 
 
 class ServerSettings(BaseModel):
@@ -159,9 +176,67 @@ class ServerCreateResponse(BaseModel):
     server: ServerInfo
 
 
+class JobInfo(BaseModel):
+    id: str
+    kind: str
+    server_id: Optional[str] = None
+    status: str
+    phase: str
+    bytes_downloaded: int = 0
+    files_done: int = 0
+    files_total: Optional[int] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    result: Optional[dict] = None
+    created_at: str
+    updated_at: str
+
+
+class JobListResponse(BaseModel):
+    jobs: list[JobInfo]
+
+
 class ServerActionResponse(BaseModel):
     server_id: str
     status: str
+    ready: Optional[bool] = None
+    ready_via: Optional[str] = None
+    boot_seconds: Optional[float] = None
+    reported_boot_seconds: Optional[float] = None
+
+
+class JarCacheStats(BaseModel):
+    blobs: int
+    bytes: int
+    references: int
+    orphans: int
+
+
+class JarCacheGcResponse(BaseModel):
+    removed: int
+    freed_bytes: int
+
+
+class DnsRateLimitStats(BaseModel):
+    rate_per_minute: int
+    burst: int
+    tokens: float
+    paused_seconds: float
+    requests: int
+    requests_last_5m: int
+    throttled: int
+    server_errors: int
+    retries: int
+    wait_seconds: float
+
+
+class ModrinthCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    ttl_seconds: int
+    hits: int
+    misses: int
+    revalidated: int
 
 
 class CommandRequest(BaseModel):
@@ -174,6 +249,23 @@ class CommandResponse(BaseModel):
     output: str
 
 
+class CommandBatchRequest(BaseModel):
+    commands: list[str] = Field(..., min_length=1, max_length=100)
+    stop_on_error: bool = False
+
+
+class CommandResult(BaseModel):
+    command: str
+    ok: bool
+    output: str
+
+
+class CommandBatchResponse(BaseModel):
+    server_id: str
+    results: list[CommandResult]
+    stopped: bool = False
+
+
 class LoginRequest(BaseModel):
     username: str = Field(..., min_length=1, max_length=64)
     password: str = Field(..., min_length=1, max_length=128)
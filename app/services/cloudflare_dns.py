@@ -1,8 +1,158 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
 import httpx
 
+logger = logging.getLogger(__name__)
+
+MANAGED_COMMENT = "Managed by mc-manager"
+SRV_PREFIX = "_minecraft._tcp."
+LIST_PAGE_SIZE = 500
+
+# Request priorities: provisioning a user is waiting on goes ahead of background reconciles.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 300
+# Cloudflare counts its global API limit (1200 requests) over a five-minute window.
+QUOTA_WINDOW_SECONDS = 300
+
+
+class RateLimited(RuntimeError):
+    """An interactive request could not go out before its deadline."""
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every Cloudflare request.
+
+    Tokens refill at ``rate_per_minute`` up to ``burst``. Background requests leave the last
+    ``reserve`` tokens to interactive ones and also wait while any interactive request is
+    queued. ``pause`` empties the bucket until a server-imposed ``Retry-After`` has passed.
+    ``acquire`` with a ``timeout`` raises :class:`RateLimited` instead of waiting longer.
+    """
+
+    def __init__(self, rate_per_minute: int, burst: int) -> None:
+        self.rate_per_second = max(1, rate_per_minute) / 60.0
+        self.burst = max(1, burst)
+        self.reserve = min(self.burst - 1, max(1, self.burst // 4))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+        self._recent: deque[float] = deque()
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, priority: int = BACKGROUND, timeout: Optional[float] = None) -> None:
+        started = time.monotonic()
+        deadline = None if timeout is None else started + max(0.0, timeout)
+        with self._cond:
+            if priority == INTERACTIVE:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    floor = 1.0 if priority == INTERACTIVE else 1.0 + self.reserve
+                    yielding = priority != INTERACTIVE and self._interactive_waiting > 0
+                    if now >= self._paused_until and self._tokens >= floor and not yielding:
+                        self._tokens -= 1.0
+                        self.wait_seconds += now - started
+                        return
+                    if deadline is not None and now >= deadline:
+                        raise RateLimited("Cloudflare rate limit: request not sent before its deadline")
+                    if now < self._paused_until:
+                        wait = self._paused_until - now
+                    else:
+                        wait = max(0.01, (floor - self._tokens) / self.rate_per_second)
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                if priority == INTERACTIVE:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def record(self, status_code: Optional[int]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self.requests += 1
+            self._recent.append(now)
+            self._trim(now)
+            if status_code == 429:
+                self.throttled += 1
+            elif status_code is None or status_code >= 500:
+                self.server_errors += 1
+
+    def record_retry(self) -> None:
+        with self._cond:
+            self.retries += 1
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            self._refill(now)
+            self._trim(now)
+            return {
+                "rate_per_minute": round(self.rate_per_second * 60),
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "paused_seconds": round(max(0.0, self._paused_until - now), 2),
+                "requests": self.requests,
+                "requests_last_5m": len(self._recent),
+                "throttled": self.throttled,
+                "server_errors": self.server_errors,
+                "retries": self.retries,
+                "wait_seconds": round(self.wait_seconds, 2),
+            }
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - QUOTA_WINDOW_SECONDS
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return min(MAX_RETRY_AFTER_SECONDS, max(0.0, float(value)))
+    except ValueError:
+        return None
+
 
 class CloudflareDNS:
-    def __init__(self, api_token: str, zone_id: str | None, zone_name: str | None) -> None:
+    def __init__(
+        self,
+        api_token: str,
+        zone_id: str | None,
+        zone_name: str | None,
+        limiter: Optional[RateLimiter] = None,
+        max_retries: int = 4,
+        backoff_seconds: float = 1.0,
+        instance_id: Optional[str] = None,
+        interactive_wait_seconds: float = 5.0,
+    ) -> None:
         self.api_token = api_token.strip()
         self.zone_id = (zone_id or "").strip() or None
         self.zone_name = (zone_name or "").strip() or None
@@ -10,6 +160,45 @@ class CloudflareDNS:
         if not self.api_token:
             raise ValueError("CF_API_TOKEN is empty")
 
+        self.limiter = limiter or RateLimiter(rate_per_minute=200, burst=20)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        # How long an interactive call may queue or back off before it gives up and leaves
+        # the record to the reconciler.
+        self.interactive_wait_seconds = max(0.0, interactive_wait_seconds)
+        # Records carry the comment of the manager that wrote them; only our own are deleted,
+        # so managers sharing a zone (and parent domain) never remove each other's records.
+        instance_id = (instance_id or "").strip()
+        self.managed_comment = f"{MANAGED_COMMENT} ({instance_id})" if instance_id else MANAGED_COMMENT
+        self._client: httpx.Client | None = None
+        self._lock = threading.Lock()
+        # Flipped off the first time the zone rejects the batch endpoint.
+        self._batch_supported = True
+        # Last known SRV records under the parent domain, by server FQDN. Kept current by every
+        # write this client makes, so incremental syncs diff in memory; None forces a listing.
+        self._records: Optional[dict[str, list[dict]]] = None
+        self._records_lock = threading.Lock()
+        # One reconcile at a time. Interactive upserts and deletes do not take it, so they
+        # never queue behind a background pass.
+        self._sync_lock = threading.Lock()
+        # FQDNs with a write in flight. A reconcile skips names an interactive call holds and
+        # an interactive call waits for a reconcile writing its name, so the two never both
+        # create the same record.
+        self._claims: set[str] = set()
+        self._claims_cond = threading.Condition(self._records_lock)
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self._base(),
+                    headers=self._headers(),
+                    timeout=15,
+                    limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+                )
+            return self._client
+
     def _headers(self) -> dict[str, str]:
         return {
             "Authorization": f"Bearer {self.api_token}",
@@ -19,106 +208,373 @@ class CloudflareDNS:
     def _base(self) -> str:
         return "https://api.cloudflare.com/client/v4"
 
-    def _get_zone_id(self) -> str:
+    def _send(self, method: str, path: str, priority: int, **kwargs: Any) -> httpx.Response:
+        """
+        Sends one request through the shared limiter, retrying rate limits and transient
+        failures with jittered exponential backoff (or the server's ``Retry-After``).
+
+        A POST is only retried when Cloudflare cannot have acted on it (429, or the
+        connection never opened), so a create is never applied twice. Interactive requests
+        raise :class:`RateLimited` once ``interactive_wait_seconds`` would be exceeded rather
+        than holding up the caller.
+        """
+        deadline = None
+        if priority == INTERACTIVE:
+            deadline = time.monotonic() + self.interactive_wait_seconds
+        attempt = 0
+        while True:
+            self.limiter.acquire(priority, None if deadline is None else deadline - time.monotonic())
+            retry_after: Optional[float] = None
+            rate_limited = False
+            try:
+                r = self.client.request(method, path, **kwargs)
+            except httpx.TransportError as exc:
+                self.limiter.record(None)
+                retryable = method != "POST" or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                reason = str(exc) or exc.__class__.__name__
+            else:
+                self.limiter.record(r.status_code)
+                retryable = r.status_code == 429 or (r.status_code in RETRYABLE_STATUS and method != "POST")
+                if not retryable or attempt >= self.max_retries:
+                    r.raise_for_status()
+                    return r
+                retry_after = _retry_after(r)
+                rate_limited = r.status_code == 429
+                reason = f"HTTP {r.status_code}"
+            delay = retry_after
+            if delay is None:
+                delay = self.backoff_seconds * (2**attempt) * (0.5 + random.random())
+            attempt += 1
+            if rate_limited or retry_after is not None:
+                # Rate limits apply to the whole token, so every caller waits them out.
+                self.limiter.pause(delay)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise RateLimited(f"Cloudflare {method} {path}: {reason}; not retrying past the deadline")
+            self.limiter.record_retry()
+            logger.info("Cloudflare %s %s: %s; retrying in %.1fs", method, path, reason, delay)
+            if not (rate_limited or retry_after is not None):
+                time.sleep(delay)
+
+    def _request(
+        self, method: str, path: str, action: str, priority: int = BACKGROUND, **kwargs: Any
+    ) -> dict[str, Any]:
+        r = self._send(method, path, priority, **kwargs)
+        data = r.json()
+        if not data.get("success"):
+            raise RuntimeError(f"Cloudflare {action} failed: {data.get('errors')}")
+        return data
+
+    def _get_zone_id(self, priority: int = BACKGROUND) -> str:
         if self.zone_id:
             return self.zone_id
         if not self.zone_name:
             raise ValueError("Set CF_ZONE_ID or CF_ZONE_NAME")
 
-        with httpx.Client(timeout=15) as client:
-            r = client.get(
-                f"{self._base()}/zones",
-                headers=self._headers(),
-                params={"name": self.zone_name, "status": "active", "per_page": 50},
-            )
-            r.raise_for_status()
-            data = r.json()
-            if not data.get("success") or not data.get("result"):
-                raise RuntimeError(f"Could not find zone for {self.zone_name}: {data.get('errors')}")
-            return data["result"][0]["id"]
-
-    def _list_records(self, zone_id: str, record_type: str, name: str) -> list[dict]:
-        with httpx.Client(timeout=15) as client:
-            r = client.get(
-                f"{self._base()}/zones/{zone_id}/dns_records",
-                headers=self._headers(),
-                params={"type": record_type, "name": name, "per_page": 100},
+        data = self._request(
+            "GET",
+            "/zones",
+            "zone lookup",
+            priority=priority,
+            params={"name": self.zone_name, "status": "active", "per_page": 50},
+        )
+        if not data.get("result"):
+            raise RuntimeError(f"Could not find zone for {self.zone_name}: {data.get('errors')}")
+        # Zone ids never change; resolve the name once per process.
+        self.zone_id = data["result"][0]["id"]
+        return self.zone_id
+
+    def _list_records(self, zone_id: str, record_type: str, name: str, priority: int = BACKGROUND) -> list[dict]:
+        data = self._request(
+            "GET",
+            f"/zones/{zone_id}/dns_records",
+            "list",
+            priority=priority,
+            params={"type": record_type, "name": name, "per_page": 100},
+        )
+        return data.get("result", [])
+
+    def list_minecraft_srv(self, parent_domain: str) -> list[dict]:
+        """Every Minecraft SRV record under ``parent_domain``, paging through the zone once."""
+        zone_id = self._get_zone_id()
+        suffix = f".{parent_domain.strip('.')}".lower()
+        records: list[dict] = []
+        page = 1
+        while True:
+            data = self._request(
+                "GET",
+                f"/zones/{zone_id}/dns_records",
+                "list",
+                params={
+                    "type": "SRV",
+                    "name.endswith": suffix,
+                    "per_page": LIST_PAGE_SIZE,
+                    "page": page,
+                },
             )
-            r.raise_for_status()
-            data = r.json()
-            if not data.get("success"):
-                raise RuntimeError(f"Cloudflare list failed: {data.get('errors')}")
-            return data.get("result", [])
+            for rec in data.get("result") or []:
+                name = (rec.get("name") or "").lower()
+                if name.startswith(SRV_PREFIX) and name.endswith(suffix):
+                    records.append(rec)
+            info = data.get("result_info") or {}
+            if page >= int(info.get("total_pages") or 1):
+                return records
+            page += 1
 
-    def upsert_minecraft_srv(self, server_fqdn: str, port: int) -> str:
+    def sync_minecraft_srv(
+        self, desired: dict[str, Optional[int]], parent_domain: str, refresh: bool = True
+    ) -> dict[str, int]:
         """
-        Creates or updates:
-          name:   _minecraft._tcp.<server_fqdn>
-          target: <server_fqdn>
-          port:   <port>
+        Brings the SRV records under ``parent_domain`` in line with ``desired`` in one pass.
+
+        ``desired`` maps each server FQDN to its port, or to None when the server exists but
+        has no published port right now (stopped); its record is left alone. Records this
+        instance created for FQDNs that are not in ``desired`` are deleted; hand-made records
+        are never touched. With ``refresh=False`` the diff runs against the last known records
+        and costs no API call when nothing changed. Returns counts of created, updated,
+        deleted and unchanged records.
         """
+        with self._sync_lock:
+            with self._records_lock:
+                known = self._records is not None
+            if refresh or not known:
+                listed = self.list_minecraft_srv(parent_domain)
+                with self._records_lock:
+                    self._records = {}
+                    for rec in listed:
+                        self._remember(rec)
+            try:
+                return self._sync(desired)
+            except Exception:
+                # Some changes may have landed; relist before trusting the snapshot again.
+                with self._records_lock:
+                    self._records = None
+                raise
+
+    def _sync(self, desired: dict[str, Optional[int]]) -> dict[str, int]:
+        wanted = {fqdn.rstrip(".").lower(): port for fqdn, port in desired.items()}
+        posts: list[dict] = []
+        puts: list[dict] = []
+        deletes: list[dict] = []
+        unchanged = 0
+        touched: set[str] = set()
+        # Plan and claim under one lock hold, so an interactive write either landed in the
+        # snapshot already or waits for this pass.
+        with self._records_lock:
+            existing = self._records or {}
+            for fqdn, port in wanted.items():
+                records = existing.get(fqdn) or []
+                if port is None or fqdn in self._claims:
+                    unchanged += len(records)
+                    continue
+                if not records:
+                    posts.append(self._srv_record(fqdn, port))
+                    touched.add(fqdn)
+                    continue
+                rec, extra = records[0], records[1:]
+                if self._srv_matches(rec, fqdn, port):
+                    unchanged += 1
+                else:
+                    puts.append({"id": rec["id"], **self._srv_record(fqdn, port)})
+                    touched.add(fqdn)
+                dups = [{"id": dup["id"]} for dup in extra if self._owned(dup)]
+                if dups:
+                    deletes.extend(dups)
+                    touched.add(fqdn)
+            for fqdn, records in existing.items():
+                if fqdn in wanted or fqdn in self._claims:
+                    continue
+                orphans = [{"id": rec["id"]} for rec in records if self._owned(rec)]
+                if orphans:
+                    deletes.extend(orphans)
+                    touched.add(fqdn)
+            self._claims |= touched
+
+        try:
+            if posts or puts or deletes:
+                created, updated = self._apply(posts, puts, deletes)
+                with self._records_lock:
+                    if self._records is None or len(created) != len(posts) or len(updated) != len(puts):
+                        # The response did not echo every record; relist on the next sync.
+                        self._records = None
+                    else:
+                        replaced = {rec["id"] for rec in deletes + puts}
+                        for fqdn in list(self._records):
+                            self._records[fqdn] = [
+                                rec for rec in self._records[fqdn] if rec.get("id") not in replaced
+                            ]
+                            if not self._records[fqdn]:
+                                del self._records[fqdn]
+                        for rec in created + updated:
+                            self._remember(rec)
+        finally:
+            self._release_claims(touched)
+        return {
+            "created": len(posts),
+            "updated": len(puts),
+            "deleted": len(deletes),
+            "unchanged": unchanged,
+        }
+
+    def _apply(
+        self, posts: list[dict], puts: list[dict], deletes: list[dict]
+    ) -> tuple[list[dict], list[dict]]:
+        """Applies the changes and returns the (created, updated) records as stored."""
         zone_id = self._get_zone_id()
-        srv_name = f"_minecraft._tcp.{server_fqdn}".rstrip(".")
-        target = server_fqdn.rstrip(".")
+        if self._batch_supported:
+            try:
+                data = self._request(
+                    "POST",
+                    f"/zones/{zone_id}/dns_records/batch",
+                    "batch",
+                    json={"deletes": deletes, "puts": puts, "posts": posts},
+                )
+                result = data.get("result") or {}
+                return list(result.get("posts") or []), list(result.get("puts") or [])
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code not in (404, 405, 501):
+                    raise
+                logger.info("Cloudflare batch DNS endpoint unavailable; applying changes one by one")
+                self._batch_supported = False
+        created: list[dict] = []
+        updated: list[dict] = []
+        for rec in deletes:
+            self._request("DELETE", f"/zones/{zone_id}/dns_records/{rec['id']}", "delete")
+        for rec in puts:
+            body = {key: value for key, value in rec.items() if key != "id"}
+            data = self._request("PUT", f"/zones/{zone_id}/dns_records/{rec['id']}", "update", json=body)
+            updated.append(data.get("result") or rec)
+        for rec in posts:
+            data = self._request("POST", f"/zones/{zone_id}/dns_records", "create", json=rec)
+            created.append(data.get("result") or rec)
+        return created, updated
+
+    def _remember(self, rec: dict) -> None:
+        # Callers hold _records_lock.
+        if self._records is None or not rec.get("id"):
+            return
+        name = (rec.get("name") or "").lower()
+        if name.startswith(SRV_PREFIX):
+            self._records.setdefault(name[len(SRV_PREFIX) :].rstrip("."), []).append(rec)
+
+    def _claim(self, server_fqdn: str) -> str:
+        """Claims ``server_fqdn`` for an interactive write, waiting out a reconcile writing it."""
+        key = server_fqdn.rstrip(".").lower()
+        deadline = time.monotonic() + self.interactive_wait_seconds
+        with self._claims_cond:
+            while key in self._claims:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(f"SRV record for {server_fqdn} is being reconciled; leaving it to the reconciler")
+                self._claims_cond.wait(remaining)
+            self._claims.add(key)
+        return key
 
-        desired = {
+    def _release_claims(self, keys: set[str]) -> None:
+        if not keys:
+            return
+        with self._claims_cond:
+            self._claims -= keys
+            self._claims_cond.notify_all()
+
+    def _forget(self, server_fqdn: str) -> None:
+        # Callers hold _records_lock.
+        if self._records is not None:
+            self._records.pop(server_fqdn.rstrip(".").lower(), None)
+
+    def _owned(self, rec: dict) -> bool:
+        # Untagged records predate instance ids (or come from an instance without one).
+        return rec.get("comment") in (self.managed_comment, MANAGED_COMMENT)
+
+    def _srv_record(self, server_fqdn: str, port: int) -> dict[str, Any]:
+        target = server_fqdn.rstrip(".")
+        return {
             "type": "SRV",
-            "name": srv_name,
+            "name": f"{SRV_PREFIX}{target}",
             "data": {"priority": 0, "weight": 0, "port": int(port), "target": target},
             "ttl": 120,
-            "comment": "Managed by mc-manager",
+            "comment": self.managed_comment,
         }
 
-        existing = self._list_records(zone_id, "SRV", srv_name)
+    def _srv_matches(self, rec: dict, server_fqdn: str, port: int) -> bool:
+        current = rec.get("data") or {}
+        try:
+            current_port = int(current.get("port", -1))
+        except (TypeError, ValueError):
+            return False
+        return current_port == int(port) and (current.get("target") or "").rstrip(".").lower() == server_fqdn.rstrip(".").lower()
 
-        with httpx.Client(timeout=15) as client:
-            if existing:
-                rec = existing[0]
-                rec_id = rec["id"]
-                current = rec.get("data") or {}
-                if int(current.get("port", -1)) == int(port) and (current.get("target") or "").rstrip(".") == target:
-                    return "unchanged"
+    def upsert_minecraft_srv(self, server_fqdn: str, port: int) -> str:
+        """
+        Creates or updates:
+          name:   _minecraft._tcp.<server_fqdn>
+          target: <server_fqdn>
+          port:   <port>
+        """
+        zone_id = self._get_zone_id(INTERACTIVE)
+        srv_name = f"{SRV_PREFIX}{server_fqdn}".rstrip(".")
+        desired = self._srv_record(server_fqdn, port)
 
-                r = client.put(
-                    f"{self._base()}/zones/{zone_id}/dns_records/{rec_id}",
-                    headers=self._headers(),
-                    json=desired,
+        key = self._claim(server_fqdn)
+        try:
+            existing = self._list_records(zone_id, "SRV", srv_name, priority=INTERACTIVE)
+            stored = existing
+            result = "created"
+            if existing and self._srv_matches(existing[0], server_fqdn, port):
+                result = "unchanged"
+            elif existing:
+                rec = existing[0]
+                data = self._request(
+                    "PUT", f"/zones/{zone_id}/dns_records/{rec['id']}", "update", priority=INTERACTIVE, json=desired
                 )
-                r.raise_for_status()
-                data = r.json()
-                if not data.get("success"):
-                    raise RuntimeError(f"Cloudflare update failed: {data.get('errors')}")
-                return "updated"
-
-            r = client.post(
-                f"{self._base()}/zones/{zone_id}/dns_records",
-                headers=self._headers(),
-                json=desired,
-            )
-            r.raise_for_status()
-            data = r.json()
-            if not data.get("success"):
-                raise RuntimeError(f"Cloudflare create failed: {data.get('errors')}")
-            return "created"
+                stored = [data.get("result") or {"id": rec["id"], **desired}] + existing[1:]
+                result = "updated"
+            else:
+                data = self._request(
+                    "POST", f"/zones/{zone_id}/dns_records", "create", priority=INTERACTIVE, json=desired
+                )
+                stored = [data.get("result") or {}]
+        except Exception:
+            # The write may have landed; relist before the next reconcile trusts the snapshot.
+            with self._records_lock:
+                self._records = None
+            raise
+        else:
+            with self._records_lock:
+                self._forget(server_fqdn)
+                for rec in stored:
+                    self._remember(rec)
+        finally:
+            self._release_claims({key})
+        return result
 
     def delete_minecraft_srv(self, server_fqdn: str) -> int:
-        zone_id = self._get_zone_id()
-        srv_name = f"_minecraft._tcp.{server_fqdn}".rstrip(".")
-
-        existing = self._list_records(zone_id, "SRV", srv_name)
-        if not existing:
-            return 0
+        zone_id = self._get_zone_id(INTERACTIVE)
+        srv_name = f"{SRV_PREFIX}{server_fqdn}".rstrip(".")
 
+        key = self._claim(server_fqdn)
+        try:
+            existing = self._list_records(zone_id, "SRV", srv_name, priority=INTERACTIVE)
+        except Exception:
+            self._release_claims({key})
+            raise
+        owned = [rec for rec in existing if self._owned(rec)]
         deleted = 0
-        with httpx.Client(timeout=15) as client:
-            for rec in existing:
-                rec_id = rec["id"]
-                r = client.delete(
-                    f"{self._base()}/zones/{zone_id}/dns_records/{rec_id}",
-                    headers=self._headers(),
-                )
-                r.raise_for_status()
-                data = r.json()
-                if data.get("success"):
+        try:
+            for rec in owned:
+                r = self._send("DELETE", f"/zones/{zone_id}/dns_records/{rec['id']}", INTERACTIVE)
+                if r.json().get("success"):
                     deleted += 1
+        finally:
+            with self._records_lock:
+                if deleted == len(owned):
+                    self._forget(server_fqdn)
+                    for rec in existing:
+                        if not self._owned(rec):
+                            self._remember(rec)
+                else:
+                    # Partially deleted; let the next sync relist.
+                    self._records = None
+            self._release_claims({key})
         return deleted
@@ -0,0 +1,156 @@
+import hashlib
+import importlib.util
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
+
+from .job_service import JobProgress
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "TemptCraft/1.0"
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    def __init__(self, status_code: int, message: str, retryable: bool = False) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retryable = retryable
+
+
+class DownloadCancelled(DownloadError):
+    def __init__(self) -> None:
+        super().__init__(499, "Download cancelled")
+
+
+class Downloader:
+    """
+    Streams files over one pooled HTTP client (HTTP/2 when ``h2`` is installed).
+
+    Transient failures (connection errors, 5xx, 429, truncated or corrupt bodies) are retried
+    with jittered exponential backoff. Anything else is fatal for that file.
+    """
+
+    def __init__(self, max_connections: int = 16, retries: int = 3, backoff_seconds: float = 0.5) -> None:
+        self.max_connections = max(1, max_connections)
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self._client: httpx.Client | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=httpx.Timeout(30.0),
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                )
+            return self._client
+
+    def download(
+        self,
+        url: str,
+        dest_path: str,
+        hashes: Optional[dict[str, Any]] = None,
+        progress: Optional[JobProgress] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """Writes ``url`` to ``dest_path``, verifying any sha1/sha512 given in ``hashes``."""
+        attempt = 0
+        while True:
+            try:
+                self._download_once(url, dest_path, hashes or {}, progress, cancel)
+                return
+            except DownloadError as exc:
+                if not exc.retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff_seconds * (2**attempt) * (0.5 + random.random())
+                attempt += 1
+                logger.info("Retrying %s in %.1fs (%s)", url, delay, exc.message)
+                if cancel is not None:
+                    if cancel.wait(delay):
+                        raise DownloadCancelled() from exc
+                else:
+                    time.sleep(delay)
+
+    def _download_once(
+        self,
+        url: str,
+        dest_path: str,
+        hashes: dict[str, Any],
+        progress: Optional[JobProgress],
+        cancel: Optional[threading.Event],
+    ) -> None:
+        sha1_expected = hashes.get("sha1") if isinstance(hashes.get("sha1"), str) else None
+        sha512_expected = hashes.get("sha512") if isinstance(hashes.get("sha512"), str) else None
+        sha1 = hashlib.sha1() if sha1_expected else None
+        sha512 = hashlib.sha512() if sha512_expected else None
+
+        try:
+            with self.client.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    raise DownloadError(
+                        response.status_code,
+                        f"Modrinth download failed: {response.text}",
+                        retryable=response.status_code in RETRYABLE_STATUS,
+                    )
+                with open(dest_path, "wb") as handle:
+                    for chunk in response.iter_bytes():
+                        if cancel is not None and cancel.is_set():
+                            raise DownloadCancelled()
+                        handle.write(chunk)
+                        if sha1:
+                            sha1.update(chunk)
+                        if sha512:
+                            sha512.update(chunk)
+                        if progress:
+                            progress.add_bytes(len(chunk))
+        except httpx.HTTPError as exc:
+            raise DownloadError(502, f"Mod download failed: {exc}", retryable=True) from exc
+
+        if sha1_expected and sha1 and sha1.hexdigest().lower() != sha1_expected.lower():
+            raise DownloadError(502, "Downloaded file sha1 hash does not match the published hash", retryable=True)
+        if sha512_expected and sha512 and sha512.hexdigest().lower() != sha512_expected.lower():
+            raise DownloadError(502, "Downloaded file sha512 hash does not match the published hash", retryable=True)
+
+
+def run_bounded(tasks: Iterable[Callable[[threading.Event], None]], workers: int) -> None:
+    """
+    Runs ``task(cancel)`` for every task on at most ``workers`` threads.
+
+    The first failure sets ``cancel`` (in-flight tasks should check it and stop), drops
+    tasks that have not started, and is re-raised once the in-flight ones have wound down.
+    """
+    cancel = threading.Event()
+    pending_tasks = list(tasks)
+    if not pending_tasks:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending_tasks)))) as pool:
+        futures = [pool.submit(task, cancel) for task in pending_tasks]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        failure = next((future.exception() for future in done if future.exception()), None)
+        if failure is None:
+            return
+        cancel.set()
+        for future in not_done:
+            future.cancel()
+        wait(not_done)
+        raise failure
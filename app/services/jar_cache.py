@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SHA512_PATTERN = re.compile(r"^[0-9a-f]{128}$")
+
+
+class JarCache:
+    """
+    Content-addressed store of mod jars under ``root``, one file per sha512.
+
+    Servers get hardlinks to the stored file, so a jar used by fifty servers is downloaded
+    once and stored once. The inode's link count doubles as the reference count: a blob with
+    no links outside the cache is an orphan and can be collected. Filesystems that refuse
+    hardlinks get a plain copy, which simply is not counted as a reference.
+
+    Only jars go through the cache. Configs and other pack files are edited in place by
+    servers and must never share an inode.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def path_for(self, sha512: str) -> Optional[str]:
+        digest = (sha512 or "").strip().lower()
+        if not SHA512_PATTERN.match(digest):
+            return None
+        return os.path.join(self.root, digest)
+
+    def link(self, sha512: Optional[str], dest_path: str) -> bool:
+        """Places the cached blob for ``sha512`` at ``dest_path``; False on a cache miss."""
+        blob = self.path_for(sha512 or "")
+        if blob is None or not os.path.isfile(blob):
+            return False
+        try:
+            self._place(blob, dest_path)
+        except FileNotFoundError:
+            # Collected between the check and the link.
+            return False
+        return True
+
+    def temp_path(self) -> str:
+        """A fresh file in the cache directory for a download that will be adopted."""
+        os.makedirs(self.root, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=self.root, prefix=".tmp-", delete=False)
+        handle.close()
+        return handle.name
+
+    def adopt(self, src_path: str, dest_path: str, sha512: Optional[str] = None) -> str:
+        """
+        Moves ``src_path`` into the cache under its sha512 and links it to ``dest_path``.
+
+        ``src_path`` must be on the same filesystem as the cache (see ``temp_path``). The
+        digest is computed when the caller did not already verify one.
+        """
+        blob = self.path_for(sha512 or "")
+        if blob is None:
+            sha512 = self._hash_file(src_path)
+            blob = self.path_for(sha512)
+        assert blob is not None
+        os.makedirs(self.root, exist_ok=True)
+        if os.path.isfile(blob):
+            os.remove(src_path)
+        else:
+            os.chmod(src_path, 0o644)
+            os.replace(src_path, blob)
+        self._place(blob, dest_path)
+        return os.path.basename(blob)
+
+    def stats(self) -> dict[str, int]:
+        blobs = 0
+        total_bytes = 0
+        references = 0
+        orphans = 0
+        for entry in self._blobs():
+            stat = entry.stat()
+            blobs += 1
+            total_bytes += stat.st_size
+            references += stat.st_nlink - 1
+            if stat.st_nlink <= 1:
+                orphans += 1
+        return {
+            "blobs": blobs,
+            "bytes": total_bytes,
+            "references": references,
+            "orphans": orphans,
+        }
+
+    def gc(self, grace_seconds: float = 3600.0) -> tuple[int, int]:
+        """
+        Removes blobs no server links to, plus abandoned temp files.
+
+        Entries touched within ``grace_seconds`` are kept so an install that has stored a
+        blob but not linked it yet is never raced. Returns (files removed, bytes freed).
+        """
+        if not os.path.isdir(self.root):
+            return 0, 0
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        freed = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                is_temp = entry.name.startswith(".tmp-")
+                if not is_temp and stat.st_nlink > 1:
+                    continue
+                if max(stat.st_mtime, stat.st_ctime) > cutoff:
+                    continue
+                try:
+                    os.remove(entry.path)
+                except OSError as exc:
+                    logger.warning("Failed to remove cached jar %s: %s", entry.name, exc)
+                    continue
+                removed += 1
+                freed += stat.st_size
+        return removed, freed
+
+    def _blobs(self):
+        if not os.path.isdir(self.root):
+            return []
+        with os.scandir(self.root) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.is_file(follow_symlinks=False) and SHA512_PATTERN.match(entry.name)
+            ]
+
+    def _place(self, blob: str, dest_path: str) -> None:
+        dest_dir = os.path.dirname(dest_path)
+        os.makedirs(dest_dir, exist_ok=True)
+        tmp_path = os.path.join(dest_dir, f".tmp-link-{os.getpid()}-{time.monotonic_ns()}")
+        try:
+            try:
+                os.link(blob, tmp_path)
+            except OSError:
+                shutil.copyfile(blob, tmp_path)
+            os.replace(tmp_path, dest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _hash_file(self, path: str) -> str:
+        digest = hashlib.sha512()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
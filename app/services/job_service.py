@@ -0,0 +1,301 @@
+import asyncio
+import inspect
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+class JobError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class JobProgress:
+    """
+    Progress sink handed to long-running service calls.
+
+    The base class is a no-op so service methods can report unconditionally, whether or not
+    they run as a job.
+    """
+
+    def phase(self, name: str) -> None:
+        return None
+
+    def set_total_files(self, total: int) -> None:
+        return None
+
+    def file_done(self, count: int = 1) -> None:
+        return None
+
+    def add_bytes(self, count: int) -> None:
+        return None
+
+    def release_slot(self) -> None:
+        """Stops counting against the concurrency limit, for a tail that only waits."""
+        return None
+
+
+class Job(JobProgress):
+    """A queued or running unit of work, updated from worker threads and read from the loop."""
+
+    # Byte counters tick per chunk; cap how often they wake subscribers.
+    PUBLISH_INTERVAL_SECONDS = 0.25
+
+    def __init__(self, manager: "JobManager", kind: str, server_id: Optional[str]) -> None:
+        self.manager = manager
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.server_id = server_id
+        self.status = "queued"
+        self.current_phase = "queued"
+        self.bytes_downloaded = 0
+        self.files_done = 0
+        self.files_total: Optional[int] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+        self.result: Any = None
+        self.created_at = self._now()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+        self._holds_slot = False
+
+    def phase(self, name: str) -> None:
+        with self._lock:
+            self.current_phase = name
+        self._changed(force=True)
+
+    def set_total_files(self, total: int) -> None:
+        with self._lock:
+            self.files_total = total
+        self._changed(force=True)
+
+    def file_done(self, count: int = 1) -> None:
+        with self._lock:
+            self.files_done += count
+        self._changed()
+
+    def add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes_downloaded += count
+        self._changed()
+
+    def release_slot(self) -> None:
+        # Called from the event loop, like the coroutine jobs that use it.
+        self.manager._release_slot(self)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "server_id": self.server_id,
+                "status": self.status,
+                "phase": self.current_phase,
+                "bytes_downloaded": self.bytes_downloaded,
+                "files_done": self.files_done,
+                "files_total": self.files_total,
+                "error": self.error,
+                "error_status": self.error_status,
+                "result": self.result,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def _set_status(self, status: str, **fields: Any) -> None:
+        with self._lock:
+            self.status = status
+            for key, value in fields.items():
+                setattr(self, key, value)
+        self._changed(force=True)
+
+    def _changed(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.updated_at = self._now()
+            if not force and now - self._last_publish < self.PUBLISH_INTERVAL_SECONDS:
+                return
+            self._last_publish = now
+        self.manager._publish(self)
+
+    def _now(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+
+class JobManager:
+    """
+    Runs long server operations off the request path.
+
+    Jobs run as tasks on the application's event loop. A global semaphore caps how many run
+    at once, a per-server lock keeps operations on the same server in submission order, and
+    the number of unfinished jobs is bounded so a burst of clicks cannot queue unbounded
+    work. Synchronous callables run in a worker thread while they hold their slot. A job
+    that is only waiting (for a server to finish booting) can hand its slot back early with
+    ``release_slot`` while keeping its server lock.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_pending: int = 32, retention: int = 200) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max(1, max_pending)
+        self.retention = max(1, retention)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._server_locks: dict[str, asyncio.Lock] = {}
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        kind: str,
+        server_id: Optional[str],
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Enqueues ``func(*args, progress=job, **kwargs)`` and returns the job immediately.
+
+        Must be called from the event loop (an ``async def`` route).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._server_locks = {}
+        pending = sum(1 for job in self._jobs.values() if not job.finished)
+        if pending >= self.max_pending:
+            raise JobError(429, "Too many jobs are queued; try again shortly")
+
+        job = Job(self, kind, server_id)
+        self._jobs[job.id] = job
+        self._trim()
+        task = loop.create_task(self._run(job, func, args, kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError(404, "Job not found")
+        return job
+
+    def recent(self, server_id: Optional[str] = None) -> list[Job]:
+        jobs = list(self._jobs.values())
+        if server_id:
+            jobs = [job for job in jobs if job.server_id == server_id]
+        return list(reversed(jobs))
+
+    async def events(self, job_id: str, keepalive_seconds: float = 15.0) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Yields job snapshots as they change, ending after the terminal one.
+
+        ``None`` is yielded when nothing changed for ``keepalive_seconds`` so SSE writers can
+        send a heartbeat.
+        """
+        job = self.get(job_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            snapshot = job.snapshot()
+            yield snapshot
+            while snapshot["status"] not in TERMINAL_STATUSES:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # Only the newest state matters to a viewer that fell behind.
+                while not queue.empty():
+                    snapshot = queue.get_nowait()
+                yield snapshot
+        finally:
+            queues = self._subscribers.get(job_id) or []
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self._subscribers.pop(job_id, None)
+
+    async def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        server_lock = None
+        if job.server_id:
+            server_lock = self._server_locks.setdefault(job.server_id, asyncio.Lock())
+        try:
+            if server_lock is not None:
+                await server_lock.acquire()
+            try:
+                assert self._semaphore is not None
+                await self._semaphore.acquire()
+                job._holds_slot = True
+                try:
+                    job._set_status("running", current_phase="starting")
+                    if inspect.iscoroutinefunction(func):
+                        result = await func(*args, progress=job, **kwargs)
+                    else:
+                        result = await asyncio.to_thread(func, *args, progress=job, **kwargs)
+                finally:
+                    self._release_slot(job)
+            finally:
+                if server_lock is not None:
+                    server_lock.release()
+        except Exception as exc:
+            status_code = getattr(exc, "status_code", 500)
+            message = getattr(exc, "message", None) or str(exc) or exc.__class__.__name__
+            if status_code >= 500:
+                logger.warning("Job %s (%s) failed: %s", job.id, job.kind, message)
+            job._set_status("failed", current_phase="failed", error=message, error_status=status_code)
+            return
+
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+        job._set_status("succeeded", current_phase="done", result=result)
+
+    def _release_slot(self, job: Job) -> None:
+        if job._holds_slot and self._semaphore is not None:
+            job._holds_slot = False
+            self._semaphore.release()
+
+    def _publish(self, job: Job) -> None:
+        loop = self._loop
+        if loop is None or not self._subscribers.get(job.id):
+            return
+        snapshot = job.snapshot()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(job.id, snapshot)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._deliver, job.id, snapshot)
+            except RuntimeError:
+                pass
+
+    def _deliver(self, job_id: str, snapshot: dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(job_id) or []):
+            queue.put_nowait(snapshot)
+
+    def _trim(self) -> None:
+        while len(self._jobs) > self.retention:
+            oldest_id = next(
+                (job_id for job_id, job in self._jobs.items() if job.finished), None
+            )
+            if oldest_id is None:
+                return
+            self._jobs.pop(oldest_id, None)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from docker.errors import DockerException
+
+from ..docker_client import AsyncDockerClient
+
+logger = logging.getLogger(__name__)
+
+
+def _split_timestamp(line: bytes) -> tuple[Optional[tuple[bytes, bytes]], bytes]:
+    """
+    Splits Docker's ``timestamps=1`` prefix (RFC 3339, nanoseconds, UTC) off ``line``.
+
+    Returns a sortable (seconds, nanoseconds) key and the original line. Docker trims
+    trailing zeros from the fraction, so it is padded before comparing.
+    """
+    stamp, sep, rest = line.partition(b" ")
+    if not sep or not stamp.endswith(b"Z") or b"T" not in stamp:
+        return None, line
+    seconds, _, fraction = stamp[:-1].partition(b".")
+    return (seconds, fraction.ljust(9, b"0")), rest
+
+
+class _LogStream:
+    """One upstream Docker log follow plus the viewers reading from it."""
+
+    def __init__(self, container_id: str, buffer_lines: int) -> None:
+        self.container_id = container_id
+        self.lines: deque[bytes] = deque(maxlen=buffer_lines)
+        self.partial = bytearray()
+        self.subscribers: set[asyncio.Queue] = set()
+        self.primed = asyncio.Event()
+        self.closed = False
+        self.task: asyncio.Task | None = None
+        self.linger: asyncio.TimerHandle | None = None
+        # Follow output at or before the last primed line was already in the tail; drop it.
+        self.primed_until: Optional[tuple[bytes, bytes]] = None
+
+    def backlog(self, tail: Optional[int]) -> bytes:
+        if tail == 0:
+            return b""
+        lines = list(self.lines)
+        if tail is not None:
+            lines = lines[-tail:]
+        return b"".join(lines)
+
+    def feed(self, chunk: bytes, priming: bool = False) -> bytes:
+        """
+        Adds the timestamped ``chunk`` to the ring and returns the complete lines it finished,
+        without their timestamps.
+        """
+        self.partial.extend(chunk)
+        end = self.partial.rfind(b"\n")
+        if end < 0:
+            return b""
+        complete = bytes(self.partial[: end + 1])
+        del self.partial[: end + 1]
+        return self._accept(complete.splitlines(keepends=True), priming)
+
+    def flush(self, priming: bool = False) -> bytes:
+        remainder = bytes(self.partial)
+        self.partial.clear()
+        return self._accept([remainder], priming) if remainder else b""
+
+    def _accept(self, raw_lines: list[bytes], priming: bool) -> bytes:
+        accepted = []
+        for raw in raw_lines:
+            key, line = _split_timestamp(raw)
+            if priming:
+                if key is not None:
+                    self.primed_until = key
+            elif self.primed_until is not None:
+                if key is not None and key <= self.primed_until:
+                    continue
+                self.primed_until = None
+            accepted.append(line)
+        self.lines.extend(accepted)
+        return b"".join(accepted)
+
+
+class LogHub:
+    """
+    Shares one Docker log follow per container between every viewer of that console.
+
+    The hub keeps the last ``buffer_lines`` lines in a ring so a new viewer gets its tail from
+    memory. Each viewer has a bounded queue; one that cannot keep up has its backlog replaced
+    by a "skipped" marker instead of slowing the upstream or the other viewers. When the last
+    viewer leaves the upstream lingers briefly so a page reload reuses it.
+    """
+
+    def __init__(
+        self,
+        buffer_lines: int = 1000,
+        subscriber_queue: int = 256,
+        linger_seconds: float = 30.0,
+    ) -> None:
+        self.buffer_lines = max(1, buffer_lines)
+        self.subscriber_queue = max(2, subscriber_queue)
+        self.linger_seconds = linger_seconds
+        self._streams: dict[str, _LogStream] = {}
+
+    async def follow(
+        self,
+        docker: AsyncDockerClient,
+        container_id: str,
+        tty: bool,
+        tail: Optional[int],
+    ) -> AsyncIterator[bytes]:
+        stream = self._streams.get(container_id)
+        if stream is None or stream.closed:
+            stream = _LogStream(container_id, self.buffer_lines)
+            self._streams[container_id] = stream
+            stream.task = asyncio.create_task(self._pump(docker, stream, tty))
+        if stream.linger is not None:
+            stream.linger.cancel()
+            stream.linger = None
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue)
+        try:
+            await stream.primed.wait()
+            backlog = stream.backlog(tail)
+            stream.subscribers.add(queue)
+            if stream.closed:
+                queue.put_nowait(None)
+            if backlog:
+                yield backlog
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                if isinstance(chunk, int):
+                    yield f"[... skipped {chunk} lines ...]\n".encode()
+                    continue
+                yield chunk
+        finally:
+            stream.subscribers.discard(queue)
+            if not stream.subscribers and not stream.closed:
+                loop = asyncio.get_running_loop()
+                stream.linger = loop.call_later(self.linger_seconds, self._close, stream)
+
+    async def _pump(self, docker: AsyncDockerClient, stream: _LogStream, tty: bool) -> None:
+        try:
+            # Prime the ring with a plain tail, then follow from just before it was taken. Lines
+            # logged in between come back from both; timestamps let the overlap be dropped.
+            since = time.time()
+            initial = await docker.logs(
+                stream.container_id, tail=self.buffer_lines, tty=tty, timestamps=True
+            )
+            stream.feed(initial, priming=True)
+            stream.flush(priming=True)
+            stream.primed.set()
+            async for chunk in docker.follow_logs(
+                stream.container_id, tail=None, tty=tty, since=since, timestamps=True
+            ):
+                complete = stream.feed(chunk)
+                if complete:
+                    self._broadcast(stream, complete)
+        except asyncio.CancelledError:
+            pass
+        except DockerException as exc:
+            logger.warning("Log stream for %s ended: %s", stream.container_id[:12], exc)
+        finally:
+            stream.closed = True
+            stream.primed.set()
+            remainder = stream.flush()
+            if remainder:
+                self._broadcast(stream, remainder)
+            for queue in list(stream.subscribers):
+                self._offer(queue, None)
+            if self._streams.get(stream.container_id) is stream:
+                self._streams.pop(stream.container_id, None)
+
+    def _broadcast(self, stream: _LogStream, chunk: bytes) -> None:
+        for queue in list(stream.subscribers):
+            self._offer(queue, chunk)
+
+    def _offer(self, queue: asyncio.Queue, item: Optional[bytes]) -> None:
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Skip the viewer ahead: its backlog collapses into a count of dropped lines.
+        skipped = 0
+        while not queue.empty():
+            dropped = queue.get_nowait()
+            if isinstance(dropped, int):
+                skipped += dropped
+            elif dropped is not None:
+                skipped += dropped.count(b"\n")
+        queue.put_nowait(skipped)
+        queue.put_nowait(item)
+
+    def _close(self, stream: _LogStream) -> None:
+        stream.linger = None
+        if stream.subscribers or stream.task is None:
+            return
+        stream.task.cancel()
@@ -1,21 +1,64 @@
+import json
+import logging
+import os
+import threading
 import time
-from typing import Any
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
 
 import httpx
 
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
 
 class MetadataService:
-    def __init__(self, cache_ttl_seconds: int = 6 * 60 * 60) -> None:
+    """
+    Version lists from Mojang and Fabric, cached in memory and on disk.
+
+    The last good payload per list is written under ``DATA_ROOT/_cache/metadata`` so a fresh
+    process answers from disk. Expired entries are still served while one background fetch
+    refreshes them (stale-while-revalidate); if that fetch fails the old list stays in use.
+    Only a list that has never been fetched makes callers wait, and concurrent callers share a
+    single upstream request.
+    """
+
+    # After a failed background refresh, wait this long before trying again.
+    RETRY_SECONDS = 60
+
+    def __init__(self, cache_ttl_seconds: int = 6 * 60 * 60, cache_dir: Optional[str] = None) -> None:
         self._cache_ttl_seconds = cache_ttl_seconds
+        self._cache_dir = cache_dir or os.path.join(settings.data_root, "_cache", "metadata")
         self._cache: dict[str, tuple[float, Any]] = {}
+        self._loaded_from_disk: set[str] = set()
+        self._inflight: dict[str, Future] = {}
+        self._retry_after: dict[str, float] = {}
+        self._lock = threading.Lock()
         self._timeout = httpx.Timeout(20.0)
 
     def minecraft_release_versions(self) -> list[str]:
-        cached = self._get_cache("mc_releases")
-        if cached is not None:
-            return cached
+        return self._cached(
+            "mc_releases",
+            "https://launchermeta.mojang.com/mc/game/version_manifest.json",
+            self._parse_minecraft_releases,
+        )
 
-        data = self._get_json("https://launchermeta.mojang.com/mc/game/version_manifest.json")
+    def fabric_game_versions(self) -> list[str]:
+        return self._cached(
+            "fabric_game_versions",
+            "https://meta.fabricmc.net/v2/versions/game",
+            self._parse_fabric_game_versions,
+        )
+
+    def fabric_loader_versions(self) -> list[dict[str, Any]]:
+        return self._cached(
+            "fabric_loader_versions",
+            "https://meta.fabricmc.net/v2/versions/loader",
+            self._parse_fabric_loader_versions,
+        )
+
+    def _parse_minecraft_releases(self, data: Any) -> list[str]:
         versions: list[str] = []
         for item in data.get("versions", []) if isinstance(data, dict) else []:
             if not isinstance(item, dict):
@@ -25,16 +68,9 @@ class MetadataService:
             version_id = item.get("id")
             if isinstance(version_id, str) and version_id.strip():
                 versions.append(version_id.strip())
-
-        self._set_cache("mc_releases", versions)
         return versions
 
-    def fabric_game_versions(self) -> list[str]:
-        cached = self._get_cache("fabric_game_versions")
-        if cached is not None:
-            return cached
-
-        data = self._get_json("https://meta.fabricmc.net/v2/versions/game")
+    def _parse_fabric_game_versions(self, data: Any) -> list[str]:
         versions: list[str] = []
         if isinstance(data, list):
             for item in data:
@@ -45,16 +81,9 @@ class MetadataService:
                 version = item.get("version")
                 if isinstance(version, str) and version.strip():
                     versions.append(version.strip())
-
-        self._set_cache("fabric_game_versions", versions)
         return versions
 
-    def fabric_loader_versions(self) -> list[dict[str, Any]]:
-        cached = self._get_cache("fabric_loader_versions")
-        if cached is not None:
-            return cached
-
-        data = self._get_json("https://meta.fabricmc.net/v2/versions/loader")
+    def _parse_fabric_loader_versions(self, data: Any) -> list[dict[str, Any]]:
         loaders: list[dict[str, Any]] = []
         if isinstance(data, list):
             for item in data:
@@ -69,22 +98,90 @@ class MetadataService:
                         "stable": bool(item.get("stable")),
                     }
                 )
-
-        self._set_cache("fabric_loader_versions", loaders)
         return loaders
 
-    def _get_cache(self, key: str) -> Any | None:
+    def _cached(self, key: str, url: str, parse: Callable[[Any], Any]) -> Any:
+        with self._lock:
+            entry = self._entry(key)
+            if entry is not None:
+                fetched_at, value = entry
+                now = time.time()
+                if (
+                    fetched_at + self._cache_ttl_seconds < now
+                    and key not in self._inflight
+                    and self._retry_after.get(key, 0) <= now
+                ):
+                    self._inflight[key] = Future()
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(key, url, parse),
+                        daemon=True,
+                        name=f"metadata-refresh-{key}",
+                    ).start()
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if leader:
+            self._refresh(key, url, parse)
+        return future.result()
+
+    def _refresh(self, key: str, url: str, parse: Callable[[Any], Any]) -> None:
+        with self._lock:
+            future = self._inflight[key]
+        try:
+            value = parse(self._get_json(url))
+        except Exception as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._retry_after[key] = time.time() + self.RETRY_SECONDS
+            if key in self._cache:
+                logger.warning("Metadata refresh for %s failed; serving the cached copy: %s", key, exc)
+            future.set_exception(exc)
+            return
+        fetched_at = time.time()
+        with self._lock:
+            self._cache[key] = (fetched_at, value)
+            self._inflight.pop(key, None)
+            self._retry_after.pop(key, None)
+        self._persist(key, fetched_at, value)
+        future.set_result(value)
+
+    def _entry(self, key: str) -> Optional[tuple[float, Any]]:
         entry = self._cache.get(key)
-        if not entry:
+        if entry is None and key not in self._loaded_from_disk:
+            self._loaded_from_disk.add(key)
+            entry = self._load(key)
+            if entry is not None:
+                self._cache[key] = entry
+        return entry
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[tuple[float, Any]]:
+        try:
+            with open(self._cache_path(key), "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            return float(data["fetched_at"]), data["value"]
+        except FileNotFoundError:
             return None
-        expires_at, value = entry
-        if expires_at < time.time():
-            self._cache.pop(key, None)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable metadata cache %s: %s", key, exc)
             return None
-        return value
 
-    def _set_cache(self, key: str, value: Any) -> None:
-        self._cache[key] = (time.time() + self._cache_ttl_seconds, value)
+    def _persist(self, key: str, fetched_at: float, value: Any) -> None:
+        path = self._cache_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump({"fetched_at": fetched_at, "value": value}, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Failed to persist metadata cache %s: %s", key, exc)
 
     def _get_json(self, url: str) -> Any:
         try:
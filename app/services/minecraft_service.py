@@ -1,28 +1,39 @@
+import asyncio
+import functools
 import json
 import os
 import re
 import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
 
 import logging
 import threading
 import time
-from .cloudflare_dns import CloudflareDNS
+from .cloudflare_dns import CloudflareDNS, RateLimiter
 
 
-from docker.errors import DockerException
+from docker.errors import APIError, DockerException, ImageNotFound
 
 from ..config import settings
-from ..docker_client import get_docker_client
+from ..docker_client import ContainerInventory, get_async_docker_client, get_docker_client
 from ..models import (
+    CommandBatchRequest,
+    CommandBatchResponse,
     CommandRequest,
+    CommandResult,
+    DnsRateLimitStats,
+    JarCacheGcResponse,
+    JarCacheStats,
     CommandResponse,
     ServerActionResponse,
     ServerCreateRequest,
     ServerCreateResponse,
     ServerInfo,
+    ServerStatus,
     ServerSettings,
     ServerSettingsResponse,
     WhitelistActionRequest,
@@ -39,7 +50,15 @@ from ..models import (
     ModConfigUpdateRequest,
 )
 from .branding_service import BrandingError, branding_paths, ensure_branding_assets
+from .downloader import DownloadError, Downloader, run_bounded
+from .jar_cache import JarCache
+from .job_service import JobProgress
+from .log_hub import LogHub
 from .modrinth_service import ModrinthError, ModrinthService
+from .port_allocator import PortAllocationError, PortAllocator, PortReservation
+from .rcon import RconError, RconPool, RconUnavailable, command_failed
+from .server_events import ServerEventHub
+from .status_prober import ProbeTarget, StatusProber
 
 
 class ServiceError(Exception):
@@ -125,22 +144,89 @@ MOD_CONFIG_EXTENSIONS = {
     ".yml",
 }
 MOD_CONFIG_MAX_BYTES = 512 * 1024
+PORT_CONFLICT_RETRIES = 3
+# The dedicated server prints this once the world is loaded and it accepts players.
+READY_LOG_PATTERN = re.compile(r"Done \((\d+(?:\.\d+)?)s\)!")
+# A failed DNS pass is retried this soon instead of waiting for the next full resync.
+DNS_RETRY_SECONDS = 60
 
 
+@dataclass(frozen=True)
+class ServerContext:
+    """
+    A managed server resolved and validated once per request.
+
+    Built from the container's inspect data; the service reuses it until that data changes.
+    """
+
+    server_id: str
+    container: Any
+    attrs: Dict[str, Any]
+    local_dir: str
+    host_dir: str
+    env: Dict[str, str]
+    modded: bool
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        return self.attrs.get("Config", {}).get("Labels") or {}
+
 
 class MinecraftService:
     def __init__(self, modrinth: Optional[ModrinthService] = None) -> None:
         self.modrinth = modrinth or ModrinthService()
         self.log = logging.getLogger("mc-manager")
+        self.inventory = ContainerInventory(settings.managed_label, settings.managed_label_value)
+        self._contexts: dict[str, ServerContext] = {}
+        self.ports = PortAllocator(settings.port_range_start, settings.port_range_end)
+        self._ports_dirty = True
+        self._ports_resynced = True
+        self.inventory.subscribe(self._on_inventory_change)
+        self.events = ServerEventHub(self.inventory, self._summary_to_info)
+        self.downloader = Downloader(
+            max_connections=settings.modpack_download_workers,
+            retries=settings.download_retries,
+        )
+        self.jars = JarCache(os.path.join(settings.data_root, "_cache", "jars"))
+        self.log_hub = LogHub(
+            buffer_lines=settings.log_buffer_lines,
+            subscriber_queue=settings.log_subscriber_queue,
+        )
+        self.rcon = RconPool(
+            timeout_seconds=settings.rcon_timeout_seconds,
+            idle_seconds=settings.rcon_idle_seconds,
+        )
+        self.status = StatusProber(
+            self._probe_targets,
+            interval_seconds=settings.status_probe_interval_seconds,
+            timeout_seconds=settings.status_probe_timeout_seconds,
+            concurrency=settings.status_probe_concurrency,
+            on_round=self._on_probe_round,
+        )
+        if settings.autopause_enabled and settings.status_probe_interval_seconds > 0:
+            self.log.warning(
+                "STATUS_PROBE_INTERVAL_SECONDS=%s with autopause enabled: periodic pings count as "
+                "connections and will keep idle servers from pausing.",
+                settings.status_probe_interval_seconds,
+            )
 
         self.dns = None
         self._dns_thread_started = False
+        # Set by container events; the reconciler debounces bursts and diffs in memory.
+        self._dns_wakeup = threading.Event()
         if settings.auto_dns_enabled:
             try:
                 self.dns = CloudflareDNS(
                     api_token=settings.cf_api_token,
                     zone_id=settings.cf_zone_id,
                     zone_name=settings.cf_zone_name,
+                    limiter=RateLimiter(
+                        rate_per_minute=settings.cf_rate_limit_per_minute,
+                        burst=settings.cf_rate_limit_burst,
+                    ),
+                    max_retries=settings.cf_max_retries,
+                    instance_id=settings.dns_instance_id,
+                    interactive_wait_seconds=settings.cf_interactive_wait_seconds,
                 )
             except Exception as exc:
                 self.log.warning(
@@ -168,70 +254,97 @@ class MinecraftService:
         deleted = self.dns.delete_minecraft_srv(fqdn)
         self.log.info("DNS SRV deleted=%s for %s", deleted, fqdn)
 
-    def reconcile_dns_once(self) -> None:
+    def reconcile_dns_once(self, full: bool = True) -> bool:
         """
-        Self-heal: for all managed containers, ensure SRV points at the right port.
+        Self-heal: diff every managed container's SRV record against Cloudflare in one pass
+        and apply only what changed.
+
+        ``full`` relists the zone first; otherwise the diff runs against the records the
+        client already knows about, so a pass where nothing changed makes no API call.
+        Returns False when the pass could not complete.
         """
         if not self.dns:
-            return
+            return True
         try:
-            docker_client = get_docker_client()
-            containers = docker_client.containers.list(
-                all=True,
-                filters={"label": f"{settings.managed_label}={settings.managed_label_value}"},
-            )
+            summaries = self.inventory.summaries()
         except DockerException as exc:
             self.log.warning("DNS reconcile skipped: Docker unavailable: %s", exc)
-            return
-
-        for c in containers:
-            labels = c.labels or {}
-            dns_name = labels.get("mc.dns_name") or self._sanitize_name(labels.get("mc.server_name", c.name))
+            return False
 
-            # Extract current host port
-            ports = c.attrs.get("NetworkSettings", {}).get("Ports") or {}
-            host_port = None
-            for bindings in ports.values():
-                if bindings and bindings[0].get("HostPort", "").isdigit():
-                    host_port = int(bindings[0]["HostPort"])
-                    break
-            if host_port is None:
-                continue
+        desired: dict[str, Optional[int]] = {}
+        for summary in summaries:
+            labels = summary.get("Labels") or {}
+            dns_name = labels.get("mc.dns_name") or self._sanitize_name(
+                labels.get("mc.server_name", self._summary_name(summary))
+            )
+            fqdn = self._server_fqdn(dns_name)
+            host_port = self._summary_host_port(summary)
+            # A stopped server has no published port; keep its record rather than churn it.
+            if desired.get(fqdn) is None:
+                desired[fqdn] = host_port
 
-            try:
-                self._provision_dns_for(dns_name, host_port)
-            except Exception as exc:
-                self.log.warning("DNS reconcile failed for %s:%s (%s)", dns_name, host_port, exc)
+        try:
+            counts = self.dns.sync_minecraft_srv(desired, settings.mc_parent_domain, refresh=full)
+        except Exception as exc:
+            self.log.warning("DNS reconcile failed (%s)", exc)
+            return False
+        if counts["created"] or counts["updated"] or counts["deleted"]:
+            self.log.info(
+                "DNS reconcile: created=%s updated=%s deleted=%s unchanged=%s",
+                counts["created"],
+                counts["updated"],
+                counts["deleted"],
+                counts["unchanged"],
+            )
+        return True
 
     def start_dns_reconciler(self) -> None:
         if not self.dns or self._dns_thread_started:
             return
         self._dns_thread_started = True
 
+        interval = max(1, settings.dns_reconcile_interval_seconds)
+
         def loop() -> None:
+            next_full = 0.0
             while True:
+                full = time.monotonic() >= next_full
+                if full:
+                    next_full = time.monotonic() + interval
                 try:
-                    self.reconcile_dns_once()
+                    ok = self.reconcile_dns_once(full=full)
                 except Exception as exc:
                     self.log.warning("DNS reconcile loop error: %s", exc)
-                time.sleep(settings.dns_reconcile_interval_seconds)
+                    ok = False
+                if not ok:
+                    next_full = min(next_full, time.monotonic() + DNS_RETRY_SECONDS)
+                if self._dns_wakeup.wait(timeout=max(0.0, next_full - time.monotonic())):
+                    # Let a burst (create, start, network connect) settle into one pass.
+                    time.sleep(settings.dns_debounce_seconds)
+                    self._dns_wakeup.clear()
 
         t = threading.Thread(target=loop, daemon=True, name="dns-reconciler")
         t.start()
-        self.log.info("DNS reconciler started (interval=%ss)", settings.dns_reconcile_interval_seconds)
+        self.log.info("DNS reconciler started (full resync every %ss)", interval)
 
     def list_servers(self) -> list[ServerInfo]:
         try:
-            docker_client = get_docker_client()
-            containers = docker_client.containers.list(
-                all=True,
-                filters={"label": f"{settings.managed_label}={settings.managed_label_value}"},
-            )
+            summaries = self.inventory.summaries()
         except DockerException as exc:
             raise ServiceError(503, f"Docker unavailable: {exc}") from exc
-        return [self._container_to_info(container) for container in containers]
-
-    def create_server(self, request: ServerCreateRequest) -> ServerCreateResponse:
+        return [self._summary_to_info(summary) for summary in summaries]
+
+    async def list_servers_async(self) -> list[ServerInfo]:
+        # A live inventory with warm image tags answers from memory; otherwise the listing
+        # hits Docker synchronously.
+        if self.inventory.live and self.inventory.image_tags_warm():
+            return self.list_servers()
+        return await asyncio.to_thread(self.list_servers)
+
+    def create_server(
+        self, request: ServerCreateRequest, progress: Optional[JobProgress] = None
+    ) -> ServerCreateResponse:
+        progress = progress or JobProgress()
         enable_rcon, rcon_password = self._resolve_rcon(request)
 
         server_id = uuid.uuid4().hex
@@ -255,10 +368,10 @@ class MinecraftService:
             raise ServiceError(500, f"Failed to create server directory: {exc}") from exc
 
         container = None
+        reservation: PortReservation | None = None
         try:
             if request.port is not None:
                 raise ServiceError(400, "Server port is assigned automatically")
-            port = self._select_port(None)
             labels = self._labels(
                 server_id,
                 display_name,
@@ -271,19 +384,38 @@ class MinecraftService:
             )
             dns_name = safe_name
             labels["mc.dns_name"] = dns_name
-            env = self._build_env(request, memory_mb, enable_rcon, rcon_password, port)
             docker_client = get_docker_client()
-            container = docker_client.containers.run(
-                settings.minecraft_image,
-                name=f"mc_{safe_name}_{server_id[:6]}",
-                detach=True,
-                ports={f"{port}/tcp": port},
-                volumes={host_dir: {"bind": "/data", "mode": "rw"}},
-                environment=env,
-                labels=labels,
-                mem_limit=f"{memory_mb}m",
-            )
+            self._ensure_image(settings.minecraft_image, progress)
+            progress.phase("creating container")
+            for attempt in range(PORT_CONFLICT_RETRIES):
+                reservation = self._reserve_port()
+                port = reservation.port
+                env = self._build_env(request, memory_mb, enable_rcon, rcon_password, port)
+                container = docker_client.containers.create(
+                    settings.minecraft_image,
+                    name=f"mc_{safe_name}_{server_id[:6]}",
+                    detach=True,
+                    ports={f"{port}/tcp": port},
+                    volumes={host_dir: {"bind": "/data", "mode": "rw"}},
+                    environment=env,
+                    labels=labels,
+                    mem_limit=f"{memory_mb}m",
+                )
+                try:
+                    container.start()
+                    break
+                except APIError as exc:
+                    if not self._is_port_conflict(exc) or attempt == PORT_CONFLICT_RETRIES - 1:
+                        raise
+                # Something outside the manager holds this port; skip it and try the next one.
+                self.ports.block(port)
+                reservation.release()
+                container.remove(force=True)
+                container = None
             container.reload()
+            self.inventory.track(container)
+            reservation.commit()
+            progress.phase("provisioning dns")
 
             # Auto-provision SRV DNS so players can join by hostname immediately
             try:
@@ -293,7 +425,14 @@ class MinecraftService:
                 self.log.warning(
                     "DNS provision failed for %s:%s (%s). Will retry.", dns_name, port, exc
                 )
+        except ServiceError:
+            if reservation is not None:
+                reservation.release()
+            shutil.rmtree(local_dir, ignore_errors=True)
+            raise
         except DockerException as exc:
+            if reservation is not None:
+                reservation.release()
             if container is not None:
                 try:
                     container.remove(force=True)
@@ -302,46 +441,157 @@ class MinecraftService:
             shutil.rmtree(local_dir, ignore_errors=True)
             raise ServiceError(500, f"Failed to create server: {exc}") from exc
 
-        server_info = self._container_to_info(container)
+        summary = self.inventory.summary(container.id)
+        if summary is None:
+            raise ServiceError(500, "Server container disappeared after creation")
+        server_info = self._summary_to_info(summary)
         return ServerCreateResponse(message="server created", server=server_info)
 
-    def start_server(self, server_id: str) -> ServerActionResponse:
-        container = self._get_container_by_server_id(server_id)
-        container = self._ensure_autopause_env(container, server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._enforce_open_access(local_dir)
-        self._apply_branding_icon(local_dir)
+    async def start_server(
+        self,
+        server_id: str,
+        wait_ready: bool = False,
+        timeout_seconds: Optional[int] = None,
+        progress: Optional[JobProgress] = None,
+    ) -> ServerActionResponse:
+        progress = progress or JobProgress()
+        progress.phase("preparing")
+        ctx = await asyncio.to_thread(self._prepare_boot, server_id)
+        progress.phase("starting")
+        started_at = time.time()
+        started = time.monotonic()
         try:
-            container.start()
+            await self._async_docker().start(ctx.container.id)
         except DockerException as exc:
             raise ServiceError(500, f"Failed to start server: {exc}") from exc
-        return ServerActionResponse(server_id=server_id, status="started")
-
-    def stop_server(self, server_id: str) -> ServerActionResponse:
-        container = self._get_container_by_server_id(server_id)
+        response = ServerActionResponse(server_id=server_id, status="started")
+        if wait_ready:
+            progress.phase("waiting for ready")
+            # The boot itself is Docker's work; don't keep other jobs queued behind the wait.
+            progress.release_slot()
+            await self._wait_until_ready(ctx.container, response, started_at, started, timeout_seconds)
+        return response
+
+    async def stop_server(self, server_id: str) -> ServerActionResponse:
+        container = await asyncio.to_thread(self._get_container_by_server_id, server_id)
         try:
-            container.stop()
+            await self._async_docker().stop(container.id)
         except DockerException as exc:
             raise ServiceError(500, f"Failed to stop server: {exc}") from exc
         return ServerActionResponse(server_id=server_id, status="stopped")
 
-    def restart_server(self, server_id: str) -> ServerActionResponse:
-        container = self._get_container_by_server_id(server_id)
-        container = self._ensure_autopause_env(container, server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._enforce_open_access(local_dir)
-        self._apply_branding_icon(local_dir)
+    async def restart_server(
+        self,
+        server_id: str,
+        wait_ready: bool = False,
+        timeout_seconds: Optional[int] = None,
+        progress: Optional[JobProgress] = None,
+    ) -> ServerActionResponse:
+        progress = progress or JobProgress()
+        progress.phase("preparing")
+        ctx = await asyncio.to_thread(self._prepare_boot, server_id)
+        progress.phase("restarting")
+        started_at = time.time()
+        started = time.monotonic()
         try:
-            container.restart()
+            await self._async_docker().restart(ctx.container.id)
         except DockerException as exc:
             raise ServiceError(500, f"Failed to restart server: {exc}") from exc
-        return ServerActionResponse(server_id=server_id, status="restarted")
+        response = ServerActionResponse(server_id=server_id, status="restarted")
+        if wait_ready:
+            progress.phase("waiting for ready")
+            # The boot itself is Docker's work; don't keep other jobs queued behind the wait.
+            progress.release_slot()
+            await self._wait_until_ready(ctx.container, response, started_at, started, timeout_seconds)
+        return response
+
+    async def _wait_until_ready(
+        self,
+        container,
+        response: ServerActionResponse,
+        started_at: float,
+        started: float,
+        timeout_seconds: Optional[int],
+    ) -> None:
+        """
+        Waits for the server started at ``started_at`` to become joinable and records it on
+        ``response``.
+
+        Readiness is whichever comes first: the "Done (Xs)!" log line or a successful status
+        ping. A server that stops logging (crashed or stopped) or exceeds the timeout is
+        reported with ``ready=False`` rather than as an error.
+        """
+        timeout = timeout_seconds or settings.server_ready_timeout_seconds
+        watchers = [
+            asyncio.create_task(self._ready_from_logs(container, started_at)),
+            asyncio.create_task(self._ready_from_ping(container.id)),
+        ]
+        try:
+            pending = set(watchers)
+            deadline = time.monotonic() + timeout
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for task in done:
+                    outcome = task.result() if not task.exception() else None
+                    if outcome is None:
+                        continue
+                    source, reported = outcome
+                    if source == "exited":
+                        response.ready = False
+                        return
+                    response.ready = True
+                    response.ready_via = source
+                    response.boot_seconds = round(time.monotonic() - started, 2)
+                    if reported is not None:
+                        response.reported_boot_seconds = reported
+                    return
+            response.ready = False
+        finally:
+            for task in watchers:
+                task.cancel()
+
+    async def _ready_from_logs(
+        self, container, started_at: float
+    ) -> Optional[tuple[str, Optional[float]]]:
+        docker = self._async_docker()
+        tty = bool(container.attrs.get("Config", {}).get("Tty"))
+        buffer = ""
+        try:
+            async for chunk in docker.follow_logs(container.id, tail=None, tty=tty, since=started_at):
+                buffer += chunk.decode("utf-8", errors="replace")
+                match = READY_LOG_PATTERN.search(buffer)
+                if match:
+                    return "log", float(match.group(1))
+                buffer = buffer[buffer.rfind("\n") + 1 :]
+        except DockerException as exc:
+            self.log.warning("Readiness log watch for %s failed: %s", container.name, exc)
+            return None
+        # Docker ends a follow when the container stops.
+        return "exited", None
+
+    async def _ready_from_ping(self, container_id: str) -> Optional[tuple[str, Optional[float]]]:
+        while True:
+            summary = self.inventory.summary(container_id)
+            target = self._probe_target(summary) if summary else None
+            if target is not None:
+                status = await self.status.probe(target)
+                if status.online:
+                    return "ping", None
+            await asyncio.sleep(1.0)
+
+    def _prepare_boot(self, server_id: str) -> ServerContext:
+        container = self._get_container_by_server_id(server_id)
+        container = self._ensure_autopause_env(container, server_id)
+        ctx = self._server_context(server_id, container)
+        self._enforce_open_access(ctx.local_dir)
+        self._apply_branding_icon(ctx.local_dir)
+        return ctx
 
     def delete_server(self, server_id: str, retain_data: bool) -> ServerActionResponse:
         container = self._get_container_by_server_id(server_id)
@@ -359,6 +609,8 @@ class MinecraftService:
             container.remove(force=True)
         except DockerException as exc:
             raise ServiceError(500, f"Failed to delete server: {exc}") from exc
+        self.inventory.forget(container.id)
+        self._contexts.pop(server_id, None)
 
         if not retain_data:
             self._validate_local_dir(local_dir)
@@ -366,53 +618,107 @@ class MinecraftService:
 
         return ServerActionResponse(server_id=server_id, status="deleted")
 
-    def get_logs(
+    async def get_logs(
         self, server_id: str, follow: bool, tail: Optional[int]
-    ) -> Iterable[bytes] | bytes:
-        container = self._get_container_by_server_id(server_id)
+    ) -> AsyncIterator[bytes] | bytes:
+        container = await asyncio.to_thread(self._get_container_by_server_id, server_id)
+        docker = self._async_docker()
+        tty = bool(container.attrs.get("Config", {}).get("Tty"))
+        if follow:
+            return self.log_hub.follow(docker, container.id, tty, tail)
         try:
-            kwargs = {"stream": follow, "follow": follow}
-            if tail is not None:
-                kwargs["tail"] = tail
-            return container.logs(**kwargs)
+            return await docker.logs(container.id, tail=tail, tty=tty)
         except DockerException as exc:
             raise ServiceError(500, f"Failed to fetch logs: {exc}") from exc
 
-    def send_command(self, server_id: str, request: CommandRequest) -> CommandResponse:
-        container = self._get_container_by_server_id(server_id)
-        container.reload()
-        if container.status != "running":
-            raise ServiceError(409, "Server must be running to accept commands")
-        if not self._is_rcon_enabled(container):
-            raise ServiceError(409, "RCON is disabled for this server")
+    async def get_status(self, server_id: str) -> ServerStatus:
+        cached = self.status.cached(server_id)
+        if cached is not None:
+            return cached
+        container = await asyncio.to_thread(self._get_container_by_server_id, server_id)
+        summary = self.inventory.summary(container.id) or {}
+        target = self._probe_target(summary)
+        if target is None:
+            return ServerStatus(
+                server_id=server_id,
+                online=False,
+                checked_at=datetime.now(timezone.utc).isoformat(),
+                error="Server is not running",
+            )
+        return await self.status.probe(target)
+
+    async def send_command(self, server_id: str, request: CommandRequest) -> CommandResponse:
+        container = await self._command_container(server_id)
+        docker = self._async_docker()
+        outputs = await asyncio.to_thread(self._native_rcon, container, [request.command])
+        if outputs is not None:
+            return CommandResponse(server_id=server_id, exit_code=0, output=outputs[0])
         try:
-            result = container.exec_run(["rcon-cli", request.command], stdout=True, stderr=True)
+            exit_code, raw_output = await docker.exec_run(container.id, ["rcon-cli", request.command])
         except DockerException as exc:
             raise ServiceError(500, f"Failed to send command: {exc}") from exc
 
-        output = result.output.decode("utf-8", errors="replace") if result.output else ""
-        if result.exit_code != 0:
+        output = raw_output.decode("utf-8", errors="replace") if raw_output else ""
+        if exit_code != 0:
             raise ServiceError(500, f"Command failed: {output.strip()}")
-        return CommandResponse(server_id=server_id, exit_code=result.exit_code, output=output)
+        return CommandResponse(server_id=server_id, exit_code=exit_code, output=output)
+
+    async def send_commands(
+        self, server_id: str, request: CommandBatchRequest
+    ) -> CommandBatchResponse:
+        container = await self._command_container(server_id)
+        commands = [command.strip() for command in request.commands]
+        if not all(commands):
+            raise ServiceError(400, "Commands cannot be blank")
+
+        results: list[CommandResult] = []
+        outputs = await asyncio.to_thread(
+            self._native_rcon, container, commands, request.stop_on_error
+        )
+        if outputs is not None:
+            for command, output in zip(commands, outputs):
+                results.append(
+                    CommandResult(command=command, ok=not command_failed(output), output=output)
+                )
+        else:
+            docker = self._async_docker()
+            for command in commands:
+                try:
+                    exit_code, raw_output = await docker.exec_run(container.id, ["rcon-cli", command])
+                except DockerException as exc:
+                    raise ServiceError(500, f"Failed to send command: {exc}") from exc
+                output = raw_output.decode("utf-8", errors="replace") if raw_output else ""
+                ok = exit_code == 0 and not command_failed(output)
+                results.append(CommandResult(command=command, ok=ok, output=output))
+                if request.stop_on_error and not ok:
+                    break
+
+        return CommandBatchResponse(
+            server_id=server_id,
+            results=results,
+            stopped=len(results) < len(commands),
+        )
+
+    async def _command_container(self, server_id: str):
+        container = await asyncio.to_thread(self._get_container_by_server_id, server_id)
+        docker = self._async_docker()
+        try:
+            attrs = await docker.inspect_container(container.id)
+        except DockerException as exc:
+            raise ServiceError(500, f"Failed to send command: {exc}") from exc
+        if (attrs.get("State") or {}).get("Status") != "running":
+            raise ServiceError(409, "Server must be running to accept commands")
+        if not self._is_rcon_enabled(container):
+            raise ServiceError(409, "RCON is disabled for this server")
+        return container
 
     def get_settings(self, server_id: str) -> ServerSettingsResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        properties = self._read_server_properties(local_dir)
-        settings_payload = self._properties_to_settings(properties)
-        return ServerSettingsResponse(server_id=server_id, settings=settings_payload)
+        return self._settings_response(self._server_context(server_id))
 
     def update_settings(
         self, server_id: str, request: ServerSettings, restart: bool
     ) -> ServerSettingsResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
+        ctx = self._server_context(server_id)
 
         if request.server_port is not None:
             raise ServiceError(400, "Server port is managed automatically")
@@ -428,37 +734,20 @@ class MinecraftService:
             raise ServiceError(400, "No settings provided")
 
         try:
-            self._write_server_properties(local_dir, updates)
+            self._write_server_properties(ctx.local_dir, updates)
         except OSError as exc:
             raise ServiceError(500, f"Failed to update server settings: {exc}") from exc
 
         if restart:
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
-        return self.get_settings(server_id)
+        return self._settings_response(ctx)
 
     def get_whitelist(self, server_id: str) -> WhitelistResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        path = os.path.join(local_dir, "whitelist.json")
-        names: list[str] = []
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as handle:
-                    data = json.load(handle)
-                if isinstance(data, list):
-                    for entry in data:
-                        if isinstance(entry, dict) and "name" in entry:
-                            names.append(str(entry["name"]))
-            except (OSError, json.JSONDecodeError) as exc:
-                raise ServiceError(500, f"Failed to read whitelist: {exc}") from exc
-        return WhitelistResponse(server_id=server_id, names=sorted(set(names)))
+        return self._whitelist_response(self._server_context(server_id))
 
     def update_whitelist(
         self, server_id: str, request: WhitelistActionRequest
@@ -475,51 +764,40 @@ class MinecraftService:
             raise ServiceError(409, "RCON must be enabled to manage whitelist")
 
         command = f"whitelist {action} {request.name}"
-        self._exec_rcon(container, command)
-        self._exec_rcon(container, "whitelist reload")
-        return self.get_whitelist(server_id)
+        self._exec_rcon(container, [command, "whitelist reload"])
+        return self._whitelist_response(self._server_context(server_id, container))
 
     def list_mods(self, server_id: str) -> ModListResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        mods_dir = os.path.join(local_dir, "mods")
-        if not os.path.exists(mods_dir):
-            return ModListResponse(server_id=server_id, mods=[])
-        mods = [
-            name
-            for name in os.listdir(mods_dir)
-            if name.lower().endswith(".jar") and os.path.isfile(os.path.join(mods_dir, name))
-        ]
-        return ModListResponse(server_id=server_id, mods=sorted(mods))
+        return self._mods_response(self._server_context(server_id))
 
     def install_mod(
-        self, server_id: str, request: ModInstallRequest, restart: bool
+        self,
+        server_id: str,
+        request: ModInstallRequest,
+        restart: bool,
+        progress: Optional[JobProgress] = None,
     ) -> ModInstallResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        progress = progress or JobProgress()
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
+        progress.phase("resolving dependencies")
         try:
             version_data = self._resolve_mod_version(request)
-            versions = [version_data] + self._collect_required_dependencies(
+            versions = self._resolve_dependency_plan(
                 version_data,
                 loader=request.loader,
                 game_version=request.game_version,
-                visited_version_ids=set(),
-                visited_project_ids={request.project_id},
+                project_id=request.project_id,
             )
         except ModrinthError as exc:
             raise ServiceError(exc.status_code, exc.message) from exc
 
-        mods_dir = os.path.join(local_dir, "mods")
+        mods_dir = os.path.join(ctx.local_dir, "mods")
         os.makedirs(mods_dir, exist_ok=True)
         main_filename: str | None = None
+        progress.phase("downloading mods")
+        progress.set_total_files(len(versions))
         for idx, entry in enumerate(versions):
             file_info = self._select_mod_file(entry)
             filename = file_info.get("filename")
@@ -533,21 +811,27 @@ class MinecraftService:
 
             dest_path = os.path.join(mods_dir, filename)
             if os.path.exists(dest_path):
+                progress.file_done()
                 continue
 
+            hashes = file_info.get("hashes")
             try:
-                self._download_file(url, dest_path)
+                self._install_jar(
+                    url, dest_path, hashes if isinstance(hashes, dict) else {}, progress=progress
+                )
             except ModrinthError as exc:
                 raise ServiceError(exc.status_code, exc.message) from exc
             except OSError as exc:
                 raise ServiceError(500, f"Failed to save mod file: {exc}") from exc
+            progress.file_done()
 
         if not main_filename:
             raise ServiceError(500, "Unable to determine mod filename")
 
         if restart:
+            progress.phase("restarting")
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
@@ -560,18 +844,12 @@ class MinecraftService:
         restart: bool,
         overwrite: bool,
     ) -> ModUploadResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
-        mods_dir = os.path.join(local_dir, "mods")
+        mods_dir = os.path.join(ctx.local_dir, "mods")
         os.makedirs(mods_dir, exist_ok=True)
 
-        import tempfile
-
         uploaded: list[str] = []
         overwritten: list[str] = []
         skipped: list[str] = []
@@ -594,13 +872,7 @@ class MinecraftService:
                 skipped.append(safe_name)
                 continue
 
-            tmp_handle = tempfile.NamedTemporaryFile(
-                dir=mods_dir,
-                prefix=".tmp-upload-",
-                delete=False,
-            )
-            tmp_path = tmp_handle.name
-            tmp_handle.close()
+            tmp_path = self.jars.temp_path()
 
             try:
                 source = getattr(upload, "file", None)
@@ -609,7 +881,7 @@ class MinecraftService:
 
                 with open(tmp_path, "wb") as handle:
                     shutil.copyfileobj(source, handle)
-                os.replace(tmp_path, dest_path)
+                self.jars.adopt(tmp_path, dest_path)
             except ServiceError:
                 raise
             except OSError as exc:
@@ -634,7 +906,7 @@ class MinecraftService:
 
         if restart:
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
@@ -650,14 +922,13 @@ class MinecraftService:
         server_id: str,
         request: ModpackInstallRequest,
         restart: bool,
+        progress: Optional[JobProgress] = None,
     ) -> ModpackInstallResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        progress = progress or JobProgress()
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
+        progress.phase("resolving modpack")
         try:
             version_data = self._resolve_modpack_version(request)
         except ModrinthError as exc:
@@ -683,8 +954,9 @@ class MinecraftService:
         try:
             with tempfile.TemporaryDirectory(prefix="temptcraft-modpack-") as tmpdir:
                 mrpack_path = os.path.join(tmpdir, filename)
+                progress.phase("downloading modpack")
                 try:
-                    self._download_file(url, mrpack_path)
+                    self._download_file(url, mrpack_path, progress=progress)
                 except ModrinthError:
                     raise
                 except OSError as exc:
@@ -693,14 +965,17 @@ class MinecraftService:
                 with zipfile.ZipFile(mrpack_path, "r") as archive:
                     index = self._read_modpack_index(archive)
                     modpack_name = str(index.get("name") or modpack_name)
-                    self._assert_modpack_compatible(container, index)
+                    self._assert_modpack_compatible(ctx, index)
+                    progress.phase("installing files")
                     installed_files, skipped_files = self._install_modpack_files(
-                        local_dir,
+                        ctx.local_dir,
                         index.get("files") or [],
                         overwrite=bool(request.overwrite),
+                        progress=progress,
                     )
+                    progress.phase("applying overrides")
                     overrides_applied = self._extract_modpack_overrides(
-                        local_dir, archive, overwrite=bool(request.overwrite)
+                        ctx.local_dir, archive, overwrite=bool(request.overwrite)
                     )
         except zipfile.BadZipFile as exc:
             raise ServiceError(400, f"Modpack archive is invalid: {exc}") from exc
@@ -708,8 +983,9 @@ class MinecraftService:
             raise ServiceError(exc.status_code, exc.message) from exc
 
         if restart:
+            progress.phase("restarting")
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
@@ -726,18 +1002,14 @@ class MinecraftService:
     def remove_mod(
         self, server_id: str, filename: str, restart: bool
     ) -> ModListResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
         safe_name = os.path.basename(filename)
         if safe_name != filename or not safe_name.lower().endswith(".jar"):
             raise ServiceError(400, "Invalid mod filename")
 
-        mods_dir = os.path.join(local_dir, "mods")
+        mods_dir = os.path.join(ctx.local_dir, "mods")
         target = os.path.join(mods_dir, safe_name)
         if not os.path.exists(target):
             raise ServiceError(404, "Mod not found")
@@ -748,21 +1020,17 @@ class MinecraftService:
 
         if restart:
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
-        return self.list_mods(server_id)
+        return self._mods_response(ctx)
 
     def list_mod_config_files(self, server_id: str) -> ModConfigListResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
-        config_dir = os.path.join(local_dir, "config")
+        config_dir = os.path.join(ctx.local_dir, "config")
         if not os.path.isdir(config_dir):
             return ModConfigListResponse(server_id=server_id, files=[])
 
@@ -800,38 +1068,9 @@ class MinecraftService:
         return ModConfigListResponse(server_id=server_id, files=files)
 
     def get_mod_config_file(self, server_id: str, file_path: str) -> ModConfigFileResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
-
-        config_dir = os.path.join(local_dir, "config")
-        if not os.path.isdir(config_dir):
-            raise ServiceError(409, "Config folder not found. Start the server once to generate configs.")
-        full_path = self._resolve_mod_config_path(config_dir, file_path)
-        if not os.path.isfile(full_path):
-            raise ServiceError(404, "Config file not found")
-
-        try:
-            size = os.path.getsize(full_path)
-        except OSError as exc:
-            raise ServiceError(500, f"Failed to read config file: {exc}") from exc
-        if size > MOD_CONFIG_MAX_BYTES:
-            raise ServiceError(413, f"Config file too large to edit (>{MOD_CONFIG_MAX_BYTES} bytes)")
-
-        try:
-            with open(full_path, "rb") as handle:
-                data = handle.read()
-        except OSError as exc:
-            raise ServiceError(500, f"Failed to read config file: {exc}") from exc
-
-        if b"\x00" in data:
-            raise ServiceError(400, "Config file appears to be binary")
-        content = data.decode("utf-8", errors="replace")
-        rel_path = os.path.relpath(os.path.realpath(full_path), os.path.realpath(config_dir)).replace(os.sep, "/")
-        return ModConfigFileResponse(server_id=server_id, path=rel_path, content=content)
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
+        return self._mod_config_file_response(ctx, file_path)
 
     def update_mod_config_file(
         self,
@@ -840,14 +1079,10 @@ class MinecraftService:
         request: ModConfigUpdateRequest,
         restart: bool,
     ) -> ModConfigFileResponse:
-        container = self._get_container_by_server_id(server_id)
-        local_dir = self._get_local_dir(container, server_id)
-        self._validate_local_dir(local_dir)
-        self._require_local_dir_exists(local_dir)
-        self._assert_data_mount_matches(container, server_id)
-        self._ensure_modded(container)
+        ctx = self._server_context(server_id)
+        self._ensure_modded(ctx)
 
-        config_dir = os.path.join(local_dir, "config")
+        config_dir = os.path.join(ctx.local_dir, "config")
         if not os.path.isdir(config_dir):
             raise ServiceError(409, "Config folder not found. Start the server once to generate configs.")
         full_path = self._resolve_mod_config_path(config_dir, file_path)
@@ -867,11 +1102,75 @@ class MinecraftService:
 
         if restart:
             try:
-                container.restart()
+                ctx.container.restart()
             except DockerException as exc:
                 raise ServiceError(500, f"Failed to restart server: {exc}") from exc
 
-        return self.get_mod_config_file(server_id, file_path)
+        return self._mod_config_file_response(ctx, file_path)
+
+    def _settings_response(self, ctx: ServerContext) -> ServerSettingsResponse:
+        properties = self._read_server_properties(ctx.local_dir)
+        settings_payload = self._properties_to_settings(properties)
+        return ServerSettingsResponse(server_id=ctx.server_id, settings=settings_payload)
+
+    def _whitelist_response(self, ctx: ServerContext) -> WhitelistResponse:
+        path = os.path.join(ctx.local_dir, "whitelist.json")
+        names: list[str] = []
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+                if isinstance(data, list):
+                    for entry in data:
+                        if isinstance(entry, dict) and "name" in entry:
+                            names.append(str(entry["name"]))
+            except (OSError, json.JSONDecodeError) as exc:
+                raise ServiceError(500, f"Failed to read whitelist: {exc}") from exc
+        return WhitelistResponse(server_id=ctx.server_id, names=sorted(set(names)))
+
+    def _mods_response(self, ctx: ServerContext) -> ModListResponse:
+        mods_dir = os.path.join(ctx.local_dir, "mods")
+        if not os.path.exists(mods_dir):
+            return ModListResponse(server_id=ctx.server_id, mods=[])
+        mods = [
+            name
+            for name in os.listdir(mods_dir)
+            if name.lower().endswith(".jar") and os.path.isfile(os.path.join(mods_dir, name))
+        ]
+        return ModListResponse(server_id=ctx.server_id, mods=sorted(mods))
+
+    def _mod_config_file_response(self, ctx: ServerContext, file_path: str) -> ModConfigFileResponse:
+        config_dir = os.path.join(ctx.local_dir, "config")
+        if not os.path.isdir(config_dir):
+            raise ServiceError(409, "Config folder not found. Start the server once to generate configs.")
+        full_path = self._resolve_mod_config_path(config_dir, file_path)
+        if not os.path.isfile(full_path):
+            raise ServiceError(404, "Config file not found")
+
+        try:
+            size = os.path.getsize(full_path)
+        except OSError as exc:
+            raise ServiceError(500, f"Failed to read config file: {exc}") from exc
+        if size > MOD_CONFIG_MAX_BYTES:
+            raise ServiceError(413, f"Config file too large to edit (>{MOD_CONFIG_MAX_BYTES} bytes)")
+
+        try:
+            with open(full_path, "rb") as handle:
+                data = handle.read()
+        except OSError as exc:
+            raise ServiceError(500, f"Failed to read config file: {exc}") from exc
+
+        if b"\x00" in data:
+            raise ServiceError(400, "Config file appears to be binary")
+        content = data.decode("utf-8", errors="replace")
+        rel_path = os.path.relpath(os.path.realpath(full_path), os.path.realpath(config_dir)).replace(os.sep, "/")
+        return ModConfigFileResponse(server_id=ctx.server_id, path=rel_path, content=content)
+
+    def _async_docker(self):
+        try:
+            return get_async_docker_client()
+        except DockerException as exc:
+            raise ServiceError(503, f"Docker unavailable: {exc}") from exc
 
     def _ensure_data_root(self) -> None:
         try:
@@ -923,42 +1222,65 @@ class MinecraftService:
             "mc.modded": "true" if modded else "false",
         }
 
-    def _select_port(self, requested: Optional[int]) -> int:
-        used_ports = self._get_used_ports()
-        if requested is not None:
-            if requested in used_ports:
-                raise ServiceError(409, f"Port {requested} is already in use")
-            return requested
-
-        start = settings.port_range_start
-        end = settings.port_range_end
-        if start < 1 or end > 65535:
-            raise ServiceError(500, "Configured port range is out of bounds")
-        if end < start:
-            raise ServiceError(500, "Invalid port range configuration")
-        for port in range(start, end + 1):
-            if port not in used_ports:
-                return port
-        raise ServiceError(409, "No available ports in the configured range")
-
-    def _get_used_ports(self) -> set[int]:
-        used: set[int] = set()
+    def _ensure_image(self, image: str, progress: JobProgress) -> None:
+        docker_client = get_docker_client()
         try:
-            docker_client = get_docker_client()
-            containers = docker_client.containers.list(all=True)
-        except DockerException as exc:
-            raise ServiceError(503, f"Docker unavailable: {exc}") from exc
+            docker_client.images.get(image)
+            return
+        except ImageNotFound:
+            pass
+
+        progress.phase("pulling image")
+        repository, tag = image, "latest"
+        if ":" in image.rsplit("/", 1)[-1]:
+            repository, tag = image.rsplit(":", 1)
+        layer_bytes: dict[str, int] = {}
+        for event in docker_client.api.pull(repository, tag=tag, stream=True, decode=True):
+            if event.get("error"):
+                raise ServiceError(500, f"Failed to pull image {image}: {event['error']}")
+            detail = event.get("progressDetail") or {}
+            layer = event.get("id")
+            current = detail.get("current")
+            if layer and isinstance(current, int) and event.get("status") == "Downloading":
+                previous = layer_bytes.get(layer, 0)
+                if current > previous:
+                    progress.add_bytes(current - previous)
+                    layer_bytes[layer] = current
+
+    def _on_inventory_change(self, action: str, container_id: str, summary) -> None:
+        self._ports_dirty = True
+        if self.dns:
+            self._dns_wakeup.set()
+        if action in {"die", "destroy"}:
+            self.rcon.close(container_id)
+        if action == "resync":
+            self._ports_resynced = True
+
+    def _reserve_port(self, requested: Optional[int] = None) -> PortReservation:
+        if self._ports_dirty or not self.inventory.live:
+            clear_blocked = self._ports_resynced
+            self._ports_dirty = False
+            self._ports_resynced = False
+            try:
+                summaries = self.inventory.summaries()
+            except DockerException as exc:
+                self._ports_dirty = True
+                raise ServiceError(503, f"Docker unavailable: {exc}") from exc
+            bound = [
+                port.get("PublicPort")
+                for summary in summaries
+                for port in summary.get("Ports") or []
+                if isinstance(port.get("PublicPort"), int)
+            ]
+            self.ports.rebuild(bound, clear_blocked=clear_blocked)
+        try:
+            return self.ports.reserve(requested)
+        except PortAllocationError as exc:
+            raise ServiceError(exc.status_code, exc.message) from exc
 
-        for container in containers:
-            ports = container.attrs.get("NetworkSettings", {}).get("Ports") or {}
-            for bindings in ports.values():
-                if not bindings:
-                    continue
-                for binding in bindings:
-                    host_port = binding.get("HostPort")
-                    if host_port and host_port.isdigit():
-                        used.add(int(host_port))
-        return used
+    def _is_port_conflict(self, exc: APIError) -> bool:
+        message = str(getattr(exc, "explanation", None) or exc).lower()
+        return "port is already allocated" in message or "address already in use" in message
 
     def _build_env(
         self,
@@ -1029,21 +1351,17 @@ class MinecraftService:
             return 0
 
         try:
-            docker_client = get_docker_client()
-            containers = docker_client.containers.list(
-                all=True,
-                filters={"label": f"{settings.managed_label}={settings.managed_label_value}"},
-            )
+            summaries = self.inventory.summaries()
         except DockerException as exc:
             raise ServiceError(503, f"Docker unavailable: {exc}") from exc
 
         updated = 0
-        for container in containers:
-            labels = container.labels or {}
+        for summary in summaries:
+            labels = summary.get("Labels") or {}
             server_id = labels.get("mc.server_id") or ""
             if not server_id:
                 continue
-            local_dir = self._get_local_dir(container, server_id)
+            local_dir = self._local_dir_from_labels(labels, server_id)
             try:
                 self._validate_local_dir(local_dir)
             except ServiceError:
@@ -1086,42 +1404,57 @@ class MinecraftService:
             return False
         return server_type.upper() in {"FORGE", "FABRIC"}
 
-    def _ensure_modded(self, container) -> None:
+    def _ensure_modded(self, ctx: ServerContext) -> None:
+        if not ctx.modded:
+            raise ServiceError(409, "Mods require a Fabric or Forge server")
+
+    def _server_context(self, server_id: str, container=None) -> ServerContext:
+        if container is None:
+            container = self._get_container_by_server_id(server_id)
+        attrs = container.attrs
+        cached = self._contexts.get(server_id)
+        if cached is not None and cached.container is container and cached.attrs is attrs:
+            self._require_local_dir_exists(cached.local_dir)
+            return cached
+
+        local_dir = self._get_local_dir(container, server_id)
+        self._validate_local_dir(local_dir)
+        self._require_local_dir_exists(local_dir)
+        self._assert_data_mount_matches(container, server_id)
+
         labels = container.labels or {}
+        env = self._container_env_dict(container)
         modded_label = labels.get("mc.modded")
-        if modded_label is not None:
-            if modded_label.lower() == "true":
-                return
-        env_map = self._container_env_dict(container)
-        server_type = env_map.get("TYPE")
-        if server_type and self._is_modded(server_type):
-            return
-        raise ServiceError(409, "Mods require a Fabric or Forge server")
+        modded = (modded_label or "").lower() == "true" or self._is_modded(env.get("TYPE"))
+        ctx = ServerContext(
+            server_id=server_id,
+            container=container,
+            attrs=attrs,
+            local_dir=local_dir,
+            host_dir=self._server_dir(settings.host_data_root, server_id),
+            env=env,
+            modded=modded,
+        )
+        self._contexts[server_id] = ctx
+        return ctx
 
     def _get_container_by_server_id(self, server_id: str):
         try:
-            docker_client = get_docker_client()
-            containers = docker_client.containers.list(
-                all=True,
-                filters={
-                    "label": [
-                        f"{settings.managed_label}={settings.managed_label_value}",
-                        f"mc.server_id={server_id}",
-                    ]
-                },
-            )
+            container = self.inventory.get(server_id)
         except DockerException as exc:
             raise ServiceError(503, f"Docker unavailable: {exc}") from exc
-        if not containers:
+        if container is None:
             raise ServiceError(404, "Server not found")
-        return containers[0]
+        return container
 
     def _get_local_dir(self, container, server_id: str) -> str:
+        return self._local_dir_from_labels(container.labels or {}, server_id)
+
+    def _local_dir_from_labels(self, labels: Dict[str, str], server_id: str) -> str:
         expected = self._server_dir(settings.data_root, server_id)
         if os.path.isdir(expected):
             return expected
 
-        labels = container.labels or {}
         local_dir = labels.get("mc.server_dir_local")
         if local_dir and self._is_within_data_root(local_dir) and os.path.isdir(local_dir):
             return local_dir
@@ -1149,11 +1482,7 @@ class MinecraftService:
         )
 
     def _assert_data_mount_matches(self, container, server_id: str) -> None:
-        try:
-            container.reload()
-        except DockerException:
-            return
-
+        # Inspect data comes from the inventory, which refetches it after every container event.
         mounts = container.attrs.get("Mounts") or []
         source = None
         for mount in mounts:
@@ -1264,15 +1593,63 @@ class MinecraftService:
                 updates[prop_key] = str(value)
         return updates
 
-    def _exec_rcon(self, container, command: str) -> None:
+    def _exec_rcon(self, container, commands: list[str]) -> list[str]:
+        outputs = self._native_rcon(container, commands)
+        if outputs is not None:
+            return outputs
+
+        outputs = []
+        for command in commands:
+            try:
+                result = container.exec_run(["rcon-cli", command], stdout=True, stderr=True)
+            except DockerException as exc:
+                raise ServiceError(500, f"RCON command failed: {exc}") from exc
+
+            output = result.output.decode("utf-8", errors="replace") if result.output else ""
+            if result.exit_code != 0:
+                raise ServiceError(500, f"RCON command failed: {output.strip()}")
+            outputs.append(output)
+        return outputs
+
+    def _native_rcon(
+        self, container, commands: list[str], stop_on_error: bool = False
+    ) -> Optional[list[str]]:
+        """
+        Runs ``commands`` over the pooled RCON session for ``container``.
+
+        Returns None when the server cannot be reached directly so the caller falls back to
+        ``rcon-cli`` inside the container.
+        """
+        if not settings.rcon_native_enabled:
+            return None
+        target = self._rcon_target(container)
+        if target is None:
+            return None
+        host, port, password = target
         try:
-            result = container.exec_run(["rcon-cli", command], stdout=True, stderr=True)
-        except DockerException as exc:
-            raise ServiceError(500, f"RCON command failed: {exc}") from exc
+            return self.rcon.execute(container.id, host, port, password, commands, stop_on_error)
+        except RconUnavailable as exc:
+            self.log.info("Native RCON unavailable for %s: %s", container.name, exc.message)
+            return None
+        except RconError as exc:
+            raise ServiceError(exc.status_code, exc.message) from exc
 
-        output = result.output.decode("utf-8", errors="replace") if result.output else ""
-        if result.exit_code != 0:
-            raise ServiceError(500, f"RCON command failed: {output.strip()}")
+    def _rcon_target(self, container) -> Optional[tuple[str, int, str]]:
+        env = self._container_env_dict(container)
+        password = env.get("RCON_PASSWORD")
+        if not password:
+            return None
+        port_value = env.get("RCON_PORT", "")
+        port = int(port_value) if port_value.isdigit() else 25575
+        network_settings = container.attrs.get("NetworkSettings") or {}
+        networks = network_settings.get("Networks") or {}
+        host = next(
+            (net.get("IPAddress") for net in networks.values() if net and net.get("IPAddress")),
+            network_settings.get("IPAddress") or None,
+        )
+        if not host:
+            return None
+        return host, port, password
 
     def _resolve_modpack_version(self, request: ModpackInstallRequest) -> dict:
         if request.version_id:
@@ -1364,7 +1741,7 @@ class MinecraftService:
 
         return data
 
-    def _assert_modpack_compatible(self, container, index: dict[str, Any]) -> None:
+    def _assert_modpack_compatible(self, ctx: ServerContext, index: dict[str, Any]) -> None:
         dependencies = index.get("dependencies")
         if not isinstance(dependencies, dict):
             dependencies = {}
@@ -1381,8 +1758,8 @@ class MinecraftService:
         if "neoforge" in dependencies:
             raise ServiceError(409, "NeoForge modpacks are not supported (Fabric/Forge only)")
 
-        env_map = self._container_env_dict(container)
-        labels = container.labels or {}
+        env_map = ctx.env
+        labels = ctx.labels
         server_type = (env_map.get("TYPE") or labels.get("mc.server_type") or "").strip().upper()
         if required_loader and server_type and server_type != required_loader:
             raise ServiceError(
@@ -1416,14 +1793,15 @@ class MinecraftService:
         local_dir: str,
         files: Any,
         overwrite: bool,
+        progress: Optional[JobProgress] = None,
     ) -> tuple[int, int]:
+        progress = progress or JobProgress()
         if not isinstance(files, list):
             raise ServiceError(400, "Modpack index files list is invalid")
+        progress.set_total_files(len(files))
 
-        import tempfile
-
-        installed = 0
         skipped = 0
+        downloads: list[tuple[str, str, str, dict[str, Any]]] = []
         for entry in files:
             if not isinstance(entry, dict):
                 continue
@@ -1438,10 +1816,10 @@ class MinecraftService:
             if not isinstance(path, str) or not path.strip():
                 raise ServiceError(400, "Modpack entry is missing a file path")
 
-            downloads = entry.get("downloads") or []
-            if not isinstance(downloads, list) or not downloads:
+            urls = entry.get("downloads") or []
+            if not isinstance(urls, list) or not urls:
                 raise ServiceError(500, f"Modpack entry is missing downloads for: {path}")
-            url = next((d for d in downloads if isinstance(d, str) and d.strip()), None)
+            url = next((d for d in urls if isinstance(d, str) and d.strip()), None)
             if not url:
                 raise ServiceError(500, f"Modpack entry is missing downloads for: {path}")
 
@@ -1450,34 +1828,56 @@ class MinecraftService:
 
             if os.path.exists(dest_path) and not overwrite:
                 skipped += 1
+                progress.file_done()
                 continue
 
             expected_hashes = entry.get("hashes")
             hashes = expected_hashes if isinstance(expected_hashes, dict) else {}
+            downloads.append((path, url, dest_path, hashes))
 
-            tmp_handle = tempfile.NamedTemporaryFile(
-                dir=os.path.dirname(dest_path),
-                prefix=".tmp-modpack-",
-                delete=False,
-            )
-            tmp_path = tmp_handle.name
-            tmp_handle.close()
-
+        def fetch(path: str, url: str, dest_path: str, hashes: dict[str, Any], cancel) -> None:
             try:
-                self._download_file_verified(url, tmp_path, hashes=hashes)
-                os.replace(tmp_path, dest_path)
+                if dest_path.lower().endswith(".jar"):
+                    self._install_jar(url, dest_path, hashes, progress=progress, cancel=cancel)
+                else:
+                    self._install_file(url, dest_path, hashes, progress=progress, cancel=cancel)
             except OSError as exc:
                 raise ServiceError(500, f"Failed to save modpack file {path}: {exc}") from exc
-            finally:
-                if os.path.exists(tmp_path):
-                    try:
-                        os.remove(tmp_path)
-                    except OSError:
-                        pass
+            progress.file_done()
+
+        run_bounded(
+            [functools.partial(fetch, *download) for download in downloads],
+            workers=settings.modpack_download_workers,
+        )
+        return len(downloads), skipped
+
+    def _install_file(
+        self,
+        url: str,
+        dest_path: str,
+        hashes: dict[str, Any],
+        progress: Optional[JobProgress] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        import tempfile
 
-            installed += 1
+        tmp_handle = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(dest_path),
+            prefix=".tmp-modpack-",
+            delete=False,
+        )
+        tmp_path = tmp_handle.name
+        tmp_handle.close()
 
-        return installed, skipped
+        try:
+            self._download_file_verified(url, tmp_path, hashes=hashes, progress=progress, cancel=cancel)
+            os.replace(tmp_path, dest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
 
     def _extract_modpack_overrides(
         self,
@@ -1485,6 +1885,8 @@ class MinecraftService:
         archive,
         overwrite: bool,
     ) -> int:
+        import tempfile
+
         overrides_prefix = "overrides/"
         applied = 0
 
@@ -1503,144 +1905,178 @@ class MinecraftService:
             if os.path.exists(dest_path) and not overwrite:
                 continue
 
+            # Replace rather than rewrite: the existing file may be a hardlink into the jar cache.
+            tmp_path = None
             try:
-                with archive.open(info, "r") as src, open(dest_path, "wb") as dst:
+                with archive.open(info, "r") as src, tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(dest_path),
+                    prefix=".tmp-override-",
+                    delete=False,
+                ) as dst:
+                    tmp_path = dst.name
                     shutil.copyfileobj(src, dst)
+                os.replace(tmp_path, dest_path)
             except OSError as exc:
                 raise ServiceError(500, f"Failed to write modpack override {rel}: {exc}") from exc
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
             applied += 1
 
         return applied
 
-    def _collect_required_dependencies(
+    def _resolve_dependency_plan(
         self,
         version_data: dict,
         loader: Optional[str],
         game_version: Optional[str],
-        visited_version_ids: set[str],
-        visited_project_ids: set[str],
+        project_id: str,
     ) -> list[dict[str, Any]]:
-        dependencies = version_data.get("dependencies") or []
-        if not isinstance(dependencies, list):
-            return []
-
-        collected: list[dict[str, Any]] = []
-        for dep in dependencies:
-            if not isinstance(dep, dict):
-                continue
-            dep_type = str(dep.get("dependency_type") or "").lower()
-            if dep_type != "required":
-                continue
-
-            dep_version_data: dict[str, Any] | None = None
-            raw_version_id = dep.get("version_id")
-            raw_project_id = dep.get("project_id")
+        """
+        Returns ``version_data`` followed by every required dependency, one version per project.
 
-            if isinstance(raw_version_id, str) and raw_version_id.strip():
-                version_id = raw_version_id.strip()
-                if version_id in visited_version_ids:
-                    continue
-                visited_version_ids.add(version_id)
-                dep_version_data = self.modrinth.get_version(version_id)
-            elif isinstance(raw_project_id, str) and raw_project_id.strip():
-                project_id = raw_project_id.strip()
-                if project_id in visited_project_ids:
-                    continue
-                visited_project_ids.add(project_id)
-                versions = self.modrinth.get_versions(project_id, loader, game_version)
-                if not versions:
-                    raise ServiceError(
-                        404, f"No compatible versions found for required dependency: {project_id}"
+        The graph is walked a level at a time: pinned versions for the whole level come from
+        one bulk ``/versions`` call and unpinned projects are queried concurrently.
+        """
+        plan: list[dict[str, Any]] = [version_data]
+        seen_versions = {version_data.get("id")}
+        seen_projects = {project_id, version_data.get("project_id")}
+        frontier = [version_data]
+
+        while frontier:
+            version_ids: list[str] = []
+            project_ids: list[str] = []
+            for entry in frontier:
+                for dep in entry.get("dependencies") or []:
+                    if not isinstance(dep, dict):
+                        continue
+                    if str(dep.get("dependency_type") or "").lower() != "required":
+                        continue
+                    raw_version_id = dep.get("version_id")
+                    raw_project_id = dep.get("project_id")
+                    if isinstance(raw_version_id, str) and raw_version_id.strip():
+                        version_id = raw_version_id.strip()
+                        if version_id not in seen_versions:
+                            seen_versions.add(version_id)
+                            version_ids.append(version_id)
+                    elif isinstance(raw_project_id, str) and raw_project_id.strip():
+                        dep_project_id = raw_project_id.strip()
+                        if dep_project_id not in seen_projects:
+                            seen_projects.add(dep_project_id)
+                            project_ids.append(dep_project_id)
+
+            level: list[dict[str, Any]] = []
+            if version_ids:
+                fetched = {item.get("id"): item for item in self.modrinth.get_versions_bulk(version_ids)}
+                for version_id in version_ids:
+                    if version_id not in fetched:
+                        raise ServiceError(404, f"Required dependency version not found: {version_id}")
+                    level.append(fetched[version_id])
+            if project_ids:
+                with ThreadPoolExecutor(max_workers=min(8, len(project_ids))) as pool:
+                    results = list(
+                        pool.map(
+                            lambda pid: self.modrinth.get_versions(pid, loader, game_version),
+                            project_ids,
+                        )
                     )
-                dep_version_data = versions[0]
-                resolved_version_id = dep_version_data.get("id")
-                if isinstance(resolved_version_id, str) and resolved_version_id.strip():
-                    visited_version_ids.add(resolved_version_id.strip())
-            else:
-                continue
+                for dep_project_id, versions in zip(project_ids, results):
+                    if not versions:
+                        raise ServiceError(
+                            404,
+                            f"No compatible versions found for required dependency: {dep_project_id}",
+                        )
+                    level.append(versions[0])
+
+            next_frontier: list[dict[str, Any]] = []
+            next_projects: set[Any] = set()
+            for entry in level:
+                entry_project = entry.get("project_id")
+                # Two parents can pin different versions of one library; the first one wins.
+                if entry_project in next_projects or (
+                    entry_project in seen_projects and entry_project not in project_ids
+                ):
+                    continue
+                next_projects.add(entry_project)
+                seen_projects.add(entry_project)
+                seen_versions.add(entry.get("id"))
+                plan.append(entry)
+                next_frontier.append(entry)
+            frontier = next_frontier
 
-            if not isinstance(dep_version_data, dict):
-                continue
-            collected.append(dep_version_data)
-            collected.extend(
-                self._collect_required_dependencies(
-                    dep_version_data,
-                    loader=loader,
-                    game_version=game_version,
-                    visited_version_ids=visited_version_ids,
-                    visited_project_ids=visited_project_ids,
-                )
-            )
+        return plan
 
-        return collected
+    def _download_file(
+        self, url: str, dest_path: str, progress: Optional[JobProgress] = None
+    ) -> None:
+        try:
+            self.downloader.download(url, dest_path, progress=progress)
+        except DownloadError as exc:
+            raise ModrinthError(exc.status_code, exc.message) from exc
 
-    def _download_file(self, url: str, dest_path: str) -> None:
-        import httpx
+    def _install_jar(
+        self,
+        url: str,
+        dest_path: str,
+        hashes: dict[str, Any],
+        progress: Optional[JobProgress] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """Links a jar from the shared cache, downloading it into the cache on a miss."""
+        sha512 = hashes.get("sha512") if isinstance(hashes.get("sha512"), str) else None
+        if self.jars.link(sha512, dest_path):
+            return
+        tmp_path = self.jars.temp_path()
+        try:
+            self._download_file_verified(url, tmp_path, hashes=hashes, progress=progress, cancel=cancel)
+            self.jars.adopt(tmp_path, dest_path, sha512)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
 
+    def jar_cache_stats(self) -> JarCacheStats:
         try:
-            with httpx.stream(
-                "GET",
-                url,
-                headers={"User-Agent": "TemptCraft/1.0"},
-                timeout=httpx.Timeout(30.0),
-            ) as response:
-                if response.status_code >= 400:
-                    raise ModrinthError(
-                        response.status_code,
-                        f"Modrinth download failed: {response.text}",
-                    )
-                with open(dest_path, "wb") as handle:
-                    for chunk in response.iter_bytes():
-                        handle.write(chunk)
-        except httpx.RequestError as exc:
-            raise ModrinthError(502, f"Mod download failed: {exc}") from exc
+            return JarCacheStats(**self.jars.stats())
+        except OSError as exc:
+            raise ServiceError(500, f"Failed to read jar cache: {exc}") from exc
 
-    def _download_file_verified(self, url: str, dest_path: str, hashes: dict[str, Any]) -> None:
-        import hashlib
-        import httpx
+    def dns_rate_stats(self) -> DnsRateLimitStats:
+        if not self.dns:
+            raise ServiceError(404, "DNS automation is disabled")
+        return DnsRateLimitStats(**self.dns.limiter.stats())
 
-        sha1_expected = hashes.get("sha1") if isinstance(hashes.get("sha1"), str) else None
-        sha512_expected = hashes.get("sha512") if isinstance(hashes.get("sha512"), str) else None
-        sha1 = hashlib.sha1() if sha1_expected else None
-        sha512 = hashlib.sha512() if sha512_expected else None
+    def collect_jar_cache(self) -> JarCacheGcResponse:
+        try:
+            removed, freed = self.jars.gc()
+        except OSError as exc:
+            raise ServiceError(500, f"Failed to clean jar cache: {exc}") from exc
+        return JarCacheGcResponse(removed=removed, freed_bytes=freed)
 
+    def _download_file_verified(
+        self,
+        url: str,
+        dest_path: str,
+        hashes: dict[str, Any],
+        progress: Optional[JobProgress] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
         try:
-            with httpx.stream(
-                "GET",
-                url,
-                headers={"User-Agent": "TemptCraft/1.0"},
-                timeout=httpx.Timeout(30.0),
-            ) as response:
-                if response.status_code >= 400:
-                    raise ModrinthError(
-                        response.status_code,
-                        f"Modrinth download failed: {response.text}",
-                    )
-                with open(dest_path, "wb") as handle:
-                    for chunk in response.iter_bytes():
-                        handle.write(chunk)
-                        if sha1:
-                            sha1.update(chunk)
-                        if sha512:
-                            sha512.update(chunk)
-        except httpx.RequestError as exc:
-            raise ModrinthError(502, f"Mod download failed: {exc}") from exc
-
-        if sha1_expected and sha1 and sha1.hexdigest().lower() != sha1_expected.lower():
-            raise ServiceError(502, "Downloaded file sha1 hash does not match modpack index")
-        if sha512_expected and sha512 and sha512.hexdigest().lower() != sha512_expected.lower():
-            raise ServiceError(502, "Downloaded file sha512 hash does not match modpack index")
+            self.downloader.download(url, dest_path, hashes=hashes, progress=progress, cancel=cancel)
+        except DownloadError as exc:
+            raise ModrinthError(exc.status_code, exc.message) from exc
 
     def _recreate_container_for_port(self, container, server_id: str, new_port: int) -> None:
         current_container_port, current_host_port = self._get_primary_ports(container)
         if current_host_port == new_port:
             return
 
-        used_ports = self._get_used_ports()
-        if current_host_port in used_ports:
-            used_ports.remove(current_host_port)
-        if new_port in used_ports:
-            raise ServiceError(409, f"Port {new_port} is already in use")
+        reservation = self._reserve_port(new_port)
 
         labels = dict(container.labels or {})
         host_dir = labels.get("mc.server_dir") or self._server_dir(settings.host_data_root, server_id)
@@ -1656,26 +2092,29 @@ class MinecraftService:
         else:
             memory_mb = settings.default_memory_mb
 
-        image_tag = container.image.tags[0] if container.image.tags else container.image.id
+        image_tag = self._container_image_ref(container)
         container_name = container.name
 
-        try:
-            if container.status == "running":
-                container.stop()
-            container.remove()
-            docker_client = get_docker_client()
-            docker_client.containers.run(
-                image_tag,
-                name=container_name,
-                detach=True,
-                ports={f"{new_port}/tcp": new_port},
-                volumes={host_dir: {"bind": "/data", "mode": "rw"}},
-                environment=env,
-                labels=labels,
-                mem_limit=f"{memory_mb}m",
-            )
-        except DockerException as exc:
-            raise ServiceError(500, f"Failed to recreate container: {exc}") from exc
+        with reservation:
+            try:
+                if container.status == "running":
+                    container.stop()
+                container.remove()
+                docker_client = get_docker_client()
+                new_container = docker_client.containers.run(
+                    image_tag,
+                    name=container_name,
+                    detach=True,
+                    ports={f"{new_port}/tcp": new_port},
+                    volumes={host_dir: {"bind": "/data", "mode": "rw"}},
+                    environment=env,
+                    labels=labels,
+                    mem_limit=f"{memory_mb}m",
+                )
+                self.inventory.forget(container.id)
+                self.inventory.track(new_container)
+            except DockerException as exc:
+                raise ServiceError(500, f"Failed to recreate container: {exc}") from exc
 
     def _ensure_autopause_env(self, container, server_id: str):
         if not settings.autopause_enabled:
@@ -1721,7 +2160,7 @@ class MinecraftService:
         else:
             memory_mb = settings.default_memory_mb
 
-        image_tag = container.image.tags[0] if container.image.tags else container.image.id
+        image_tag = self._container_image_ref(container)
         container_name = container.name
 
         try:
@@ -1739,6 +2178,8 @@ class MinecraftService:
                 labels=labels,
                 mem_limit=f"{memory_mb}m",
             )
+            self.inventory.forget(container.id)
+            self.inventory.track(new_container)
             if start:
                 new_container.start()
         except DockerException as exc:
@@ -1766,20 +2207,61 @@ class MinecraftService:
                 env_map[key] = value
         return env_map
 
-    def _container_to_info(self, container) -> ServerInfo:
-        labels = container.labels or {}
-        ports = container.attrs.get("NetworkSettings", {}).get("Ports") or {}
-        host_port = None
-        for bindings in ports.values():
-            if not bindings:
-                continue
-            host_port_value = bindings[0].get("HostPort")
-            if host_port_value and host_port_value.isdigit():
-                host_port = int(host_port_value)
-                break
+    def _container_image_ref(self, container) -> str:
+        image_id = container.attrs.get("Image") or ""
+        tags = self.inventory.image_tags(image_id)
+        return tags[0] if tags else image_id
+
+    def _summary_name(self, summary: dict[str, Any]) -> str:
+        names = summary.get("Names") or []
+        return names[0].lstrip("/") if names else summary.get("Id", "")[:12]
+
+    def _summary_host_port(self, summary: dict[str, Any]) -> Optional[int]:
+        for port in summary.get("Ports") or []:
+            public_port = port.get("PublicPort")
+            if isinstance(public_port, int):
+                return public_port
+        return None
+
+    def _probe_targets(self) -> list[ProbeTarget]:
+        targets = []
+        for summary in self.inventory.summaries():
+            target = self._probe_target(summary)
+            if target is not None:
+                targets.append(target)
+        return targets
+
+    def _probe_target(self, summary: dict[str, Any]) -> Optional[ProbeTarget]:
+        server_id = (summary.get("Labels") or {}).get("mc.server_id")
+        if not server_id or summary.get("State") != "running":
+            return None
+        if settings.status_probe_host:
+            port = self._summary_host_port(summary)
+            if port is None:
+                return None
+            return ProbeTarget(server_id, settings.status_probe_host, port)
+        networks = (summary.get("NetworkSettings") or {}).get("Networks") or {}
+        host = next((net.get("IPAddress") for net in networks.values() if net and net.get("IPAddress")), None)
+        if not host:
+            return None
+        private_port = next(
+            (
+                port.get("PrivatePort")
+                for port in summary.get("Ports") or []
+                if port.get("Type") == "tcp" and isinstance(port.get("PrivatePort"), int)
+            ),
+            25565,
+        )
+        return ProbeTarget(server_id, host, private_port)
 
-        image_tags = container.image.tags or []
-        image_tag = image_tags[0] if image_tags else None
+    async def _on_probe_round(self) -> None:
+        await asyncio.to_thread(self.events.refresh)
+
+    def _summary_to_info(self, summary: dict[str, Any]) -> ServerInfo:
+        labels = summary.get("Labels") or {}
+
+        image_tags = self.inventory.image_tags(summary.get("ImageID") or "")
+        image_tag = image_tags[0] if image_tags else (summary.get("Image") or None)
 
         version = labels.get("mc.version") or None
         server_type = labels.get("mc.server_type") or None
@@ -1793,13 +2275,25 @@ class MinecraftService:
 
         return ServerInfo(
             server_id=labels.get("mc.server_id", ""),
-            name=labels.get("mc.server_name", container.name),
-            status=container.status,
+            name=labels.get("mc.server_name", self._summary_name(summary)),
+            status=summary.get("State") or "unknown",
             image=image_tag,
-            port=host_port,
-            container_id=container.id,
+            port=self._summary_host_port(summary),
+            container_id=summary.get("Id", ""),
             version=version,
             server_type=server_type,
             modded=modded,
             memory_mb=memory_mb,
+            **self._status_fields(labels.get("mc.server_id", ""), summary.get("State")),
         )
+
+    def _status_fields(self, server_id: str, state: Optional[str]) -> dict[str, Any]:
+        status = self.status.cached(server_id) if state == "running" else None
+        if status is None:
+            return {}
+        return {
+            "online": status.online,
+            "players_online": status.players_online,
+            "players_max": status.players_max,
+            "latency_ms": status.latency_ms,
+        }
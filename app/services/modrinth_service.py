@@ -1,10 +1,17 @@
 import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any, Optional
 
 import httpx
 
 from ..config import settings
 
+# Bulk endpoints take the ids as a JSON array in the query string; keep URLs a sane length.
+BULK_CHUNK_SIZE = 100
+
 
 class ModrinthError(Exception):
     def __init__(self, status_code: int, message: str) -> None:
@@ -13,10 +20,65 @@ class ModrinthError(Exception):
         self.message = message
 
 
+@dataclass
+class _CacheEntry:
+    expires_at: float
+    etag: Optional[str]
+    body: bytes
+
+
 class ModrinthService:
-    def __init__(self) -> None:
+    """
+    Read-only Modrinth API client over one pooled HTTP connection.
+
+    GET responses are kept in an LRU cache for ``cache_ttl_seconds``. Once an entry expires
+    it is revalidated with ``If-None-Match`` when Modrinth sent an ETag, so an unchanged
+    result costs a 304 instead of the full body. Bodies are stored raw and decoded per call,
+    so callers never share (or mutate) a cached object.
+    """
+
+    def __init__(self, cache_ttl_seconds: Optional[int] = None, cache_max_entries: Optional[int] = None) -> None:
         self.base_url = settings.modrinth_base_url.rstrip("/")
         self.timeout = httpx.Timeout(20.0)
+        self.cache_ttl_seconds = (
+            settings.modrinth_cache_ttl_seconds if cache_ttl_seconds is None else cache_ttl_seconds
+        )
+        self.cache_max_entries = max(
+            0, settings.modrinth_cache_max_entries if cache_max_entries is None else cache_max_entries
+        )
+        self._client: httpx.Client | None = None
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple, _CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    base_url=self.base_url,
+                    headers={"User-Agent": "TemptCraft/1.0"},
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+                )
+            return self._client
+
+    def cache_stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_max_entries,
+                "ttl_seconds": self.cache_ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+            }
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
 
     def search(
         self,
@@ -45,24 +107,71 @@ class ModrinthService:
     def get_version(self, version_id: str) -> dict[str, Any]:
         return self._get(f"/version/{version_id}", {})
 
+    def get_versions_bulk(self, version_ids: list[str]) -> list[dict[str, Any]]:
+        return self._get_bulk("/versions", version_ids)
+
+    def _get_bulk(self, path: str, ids: list[str]) -> list[dict[str, Any]]:
+        unique_ids = list(dict.fromkeys(ids))
+        results: list[dict[str, Any]] = []
+        for start in range(0, len(unique_ids), BULK_CHUNK_SIZE):
+            chunk = unique_ids[start : start + BULK_CHUNK_SIZE]
+            data = self._get(path, {"ids": json.dumps(chunk)})
+            if isinstance(data, list):
+                results.extend(item for item in data if isinstance(item, dict))
+        return results
+
     def _get(self, path: str, params: dict[str, str]) -> Any:
-        url = f"{self.base_url}{path}"
+        key = (path, tuple(sorted(params.items())))
+        now = time.monotonic()
+        headers: dict[str, str] = {}
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry.body)
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+
         try:
-            response = httpx.get(
-                url,
-                params=params,
-                headers={"User-Agent": "TemptCraft/1.0"},
-                timeout=self.timeout,
-            )
+            response = self.client.get(path, params=params, headers=headers)
         except httpx.RequestError as exc:
             raise ModrinthError(502, f"Modrinth request failed: {exc}") from exc
 
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                entry.expires_at = time.monotonic() + self.cache_ttl_seconds
+                self._store(key, entry)
+                self.revalidated += 1
+            return json.loads(entry.body)
+
         if response.status_code >= 400:
             raise ModrinthError(
                 response.status_code,
                 f"Modrinth error {response.status_code}: {response.text}",
             )
-        return response.json()
+        data = response.json()
+        with self._lock:
+            self.misses += 1
+            if self.cache_ttl_seconds > 0:
+                self._store(
+                    key,
+                    _CacheEntry(
+                        expires_at=time.monotonic() + self.cache_ttl_seconds,
+                        etag=response.headers.get("ETag"),
+                        body=response.content,
+                    ),
+                )
+        return data
+
+    def _store(self, key: tuple, entry: _CacheEntry) -> None:
+        if self.cache_max_entries <= 0:
+            return
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
 
     def _build_facets(
         self, project_type: str, loader: Optional[str], game_version: Optional[str]
@@ -0,0 +1,134 @@
+import threading
+from typing import Iterable, Optional
+
+
+class PortAllocationError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class PortReservation:
+    """
+    A host port held for one in-flight create.
+
+    Use as a context manager: the port is committed if the block succeeds and released if it
+    raises, so a failed create never leaks its port and never hands it out twice.
+    """
+
+    def __init__(self, allocator: "PortAllocator", port: int) -> None:
+        self.allocator = allocator
+        self.port = port
+        self._done = False
+
+    def commit(self) -> None:
+        if not self._done:
+            self._done = True
+            self.allocator._commit(self.port)
+
+    def release(self) -> None:
+        if not self._done:
+            self._done = True
+            self.allocator._release(self.port)
+
+    def __enter__(self) -> "PortReservation":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.release()
+
+
+class PortAllocator:
+    """
+    Bitset over ``start..end`` tracking host ports that are bound, reserved or blocked.
+
+    Bound ports are rebuilt from the container inventory. Reservations survive rebuilds until
+    they are committed or released. Blocked ports are ones Docker refused because something
+    outside the manager holds them. Ports a user picks outside the range are tracked in plain
+    sets so they are conflict-checked too.
+    """
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self._mask = (1 << (end - start + 1)) - 1 if end >= start else 0
+        self._bound = 0
+        self._reserved = 0
+        self._blocked = 0
+        self._bound_outside: set[int] = set()
+        self._reserved_outside: set[int] = set()
+        self._lock = threading.Lock()
+
+    def rebuild(self, bound_ports: Iterable[int], clear_blocked: bool = False) -> None:
+        bits = 0
+        outside: set[int] = set()
+        for port in bound_ports:
+            bit = self._bit(port)
+            if bit:
+                bits |= bit
+            else:
+                outside.add(port)
+        with self._lock:
+            self._bound = bits
+            self._bound_outside = outside
+            if clear_blocked:
+                self._blocked = 0
+
+    def block(self, port: int) -> None:
+        bit = self._bit(port)
+        if not bit:
+            return
+        with self._lock:
+            self._blocked |= bit
+
+    def reserve(self, requested: Optional[int] = None) -> PortReservation:
+        if self.start < 1 or self.end > 65535:
+            raise PortAllocationError(500, "Configured port range is out of bounds")
+        if self.end < self.start:
+            raise PortAllocationError(500, "Invalid port range configuration")
+        with self._lock:
+            taken = self._bound | self._reserved | self._blocked
+            if requested is not None:
+                bit = self._bit(requested)
+                if bit:
+                    in_use = bool(taken & bit)
+                else:
+                    in_use = requested in self._bound_outside or requested in self._reserved_outside
+                if in_use:
+                    raise PortAllocationError(409, f"Port {requested} is already in use")
+                if bit:
+                    self._reserved |= bit
+                else:
+                    self._reserved_outside.add(requested)
+                return PortReservation(self, requested)
+
+            free = ~taken & self._mask
+            if not free:
+                raise PortAllocationError(409, "No available ports in the configured range")
+            lowest = free & -free
+            self._reserved |= lowest
+            return PortReservation(self, self.start + lowest.bit_length() - 1)
+
+    def _commit(self, port: int) -> None:
+        bit = self._bit(port)
+        with self._lock:
+            self._reserved &= ~bit
+            self._bound |= bit
+            if not bit:
+                self._reserved_outside.discard(port)
+                self._bound_outside.add(port)
+
+    def _release(self, port: int) -> None:
+        bit = self._bit(port)
+        with self._lock:
+            self._reserved &= ~bit
+            self._reserved_outside.discard(port)
+
+    def _bit(self, port: int) -> int:
+        if port < self.start or port > self.end:
+            return 0
+        return 1 << (port - self.start)
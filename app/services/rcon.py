@@ -0,0 +1,314 @@
+import logging
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PACKET_AUTH = 3
+PACKET_COMMAND = 2
+# Any type the server does not understand is answered with a single packet carrying the same
+# id. Sent after a command, it marks the end of that command's (possibly fragmented) output.
+PACKET_SENTINEL = 100
+
+MAX_COMMAND_BYTES = 1446
+CLOSED_BY_SERVER = "RCON connection closed by server"
+
+# RCON has no status field; these are the prefixes Minecraft uses for rejected commands.
+ERROR_MARKERS = (
+    "Unknown or incomplete command",
+    "Unknown command",
+    "Incorrect argument for command",
+    "Invalid or unknown",
+    "Expected ",
+    "<--[HERE]",
+)
+# Minecraft splits command output into packets of at most this many bytes.
+MAX_FRAGMENT_BYTES = 4096
+
+
+class RconError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class RconUnavailable(RconError):
+    """The server could not be reached or refused the login; callers may fall back."""
+
+
+def command_failed(output: str) -> bool:
+    return any(marker in output for marker in ERROR_MARKERS)
+
+
+class RconConnection:
+    """A single authenticated Source RCON session."""
+
+    def __init__(
+        self, host: str, port: int, password: str, timeout_seconds: float, connect_timeout_seconds: float
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout_seconds = timeout_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.last_used = time.monotonic()
+        self._sock: Optional[socket.socket] = None
+        self._buffer = bytearray()
+        self._next_id = 1
+        # Commands of the current batch that got a response; a batch that fails part-way is
+        # never replayed.
+        self.completed = 0
+        # Bytes read during the current batch, and whether it failed because the server had
+        # already dropped the session (closed or reset before answering anything). Only then
+        # is a replay safe: a timeout may mean the command is still running.
+        self._received = 0
+        self.stale = False
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> None:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout_seconds)
+        except OSError as exc:
+            raise RconUnavailable(503, f"RCON connection failed: {exc}") from exc
+        sock.settimeout(self.timeout_seconds)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._buffer.clear()
+        try:
+            auth_id = self._allocate_id()
+            self._send(auth_id, PACKET_AUTH, self.password)
+            while True:
+                packet_id, packet_type, _ = self._read_packet()
+                if packet_id == -1:
+                    raise RconUnavailable(503, "RCON authentication failed")
+                if packet_id == auth_id and packet_type == PACKET_COMMAND:
+                    break
+        except RconError:
+            self.close()
+            raise
+        except OSError as exc:
+            self.close()
+            raise RconUnavailable(503, f"RCON login failed: {exc}") from exc
+
+    def execute(self, commands: list[str], stop_on_error: bool = False) -> list[str]:
+        """
+        Runs ``commands`` in order on this session and returns their outputs.
+
+        With ``stop_on_error`` the batch ends after the first output that looks like a
+        rejected command, so fewer outputs than commands may come back.
+        """
+        for command in commands:
+            if len(command.encode("utf-8")) > MAX_COMMAND_BYTES:
+                raise RconError(400, "Command is too long for RCON")
+        self.completed = 0
+        self.stale = False
+        if self._sock is None:
+            self.connect()
+        self._received = 0
+        try:
+            outputs: list[str] = []
+            for command in commands:
+                output = self._command(command)
+                outputs.append(output)
+                self.completed += 1
+                if stop_on_error and command_failed(output):
+                    break
+        except (OSError, RconError) as exc:
+            self.close()
+            dropped = isinstance(exc, (ConnectionResetError, BrokenPipeError, ConnectionAbortedError)) or (
+                isinstance(exc, RconError) and exc.message == CLOSED_BY_SERVER
+            )
+            self.stale = dropped and self._received == 0 and self.completed == 0
+            if isinstance(exc, RconError):
+                raise
+            raise RconError(502, f"RCON command failed: {exc}") from exc
+        self.last_used = time.monotonic()
+        return outputs
+
+    def _command(self, command: str) -> str:
+        # The vanilla server parses exactly one packet per socket read and drops the client if
+        # a read holds more, so requests are never written ahead of the previous response.
+        command_id = self._allocate_id()
+        self._send(command_id, PACKET_COMMAND, command)
+        fragments = [self._read_response(command_id)]
+        if len(fragments[0]) >= MAX_FRAGMENT_BYTES:
+            sentinel_id = self._allocate_id()
+            self._send(sentinel_id, PACKET_SENTINEL, "")
+            while True:
+                packet_id, _, body = self._read_packet()
+                if packet_id == sentinel_id:
+                    break
+                if packet_id == command_id:
+                    fragments.append(body)
+        return b"".join(fragments).decode("utf-8", errors="replace")
+
+    def _read_response(self, packet_id: int) -> bytes:
+        while True:
+            response_id, _, body = self._read_packet()
+            if response_id == packet_id:
+                return body
+
+    def close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _allocate_id(self) -> int:
+        packet_id = self._next_id
+        self._next_id = 1 if self._next_id >= 0x7FFFFFFF else self._next_id + 1
+        return packet_id
+
+    def _encode(self, packet_id: int, packet_type: int, body: str) -> bytes:
+        data = struct.pack("<ii", packet_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+        return struct.pack("<i", len(data)) + data
+
+    def _send(self, packet_id: int, packet_type: int, body: str) -> None:
+        assert self._sock is not None
+        self._sock.sendall(self._encode(packet_id, packet_type, body))
+
+    def _read_packet(self) -> tuple[int, int, bytes]:
+        self._fill(4)
+        (length,) = struct.unpack("<i", self._buffer[:4])
+        if length < 10 or length > 1 << 20:
+            raise RconError(502, "Malformed RCON packet")
+        self._fill(4 + length)
+        packet_id, packet_type = struct.unpack("<ii", self._buffer[4:12])
+        body = bytes(self._buffer[12 : 4 + length - 2])
+        del self._buffer[: 4 + length]
+        return packet_id, packet_type, body
+
+    def _fill(self, size: int) -> None:
+        assert self._sock is not None
+        while len(self._buffer) < size:
+            chunk = self._sock.recv(max(4096, size - len(self._buffer)))
+            if not chunk:
+                raise RconError(502, CLOSED_BY_SERVER)
+            self._received += len(chunk)
+            self._buffer += chunk
+
+
+@dataclass
+class _PoolEntry:
+    connection: RconConnection
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class RconPool:
+    """
+    Keeps one authenticated RCON session per server and reuses it across commands.
+
+    A session that fails mid-command is dropped and, if it had been idle in the pool, the
+    command is retried once on a fresh login. Sessions unused for ``idle_seconds`` are closed
+    by a background sweeper. Servers that could not be reached are remembered for
+    ``unavailable_seconds`` so callers fall back without waiting on a connect timeout each time.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = 10.0,
+        connect_timeout_seconds: float = 2.0,
+        idle_seconds: float = 300.0,
+        unavailable_seconds: float = 60.0,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.idle_seconds = idle_seconds
+        self.unavailable_seconds = unavailable_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, _PoolEntry] = {}
+        self._unavailable: dict[str, float] = {}
+        self._sweeper: threading.Thread | None = None
+
+    def execute(
+        self,
+        key: str,
+        host: str,
+        port: int,
+        password: str,
+        commands: list[str],
+        stop_on_error: bool = False,
+    ) -> list[str]:
+        with self._lock:
+            retry_at = self._unavailable.get(key)
+            if retry_at is not None and retry_at > time.monotonic():
+                raise RconUnavailable(503, "RCON is unreachable for this server")
+            entry = self._entries.get(key)
+            connection = entry.connection if entry else None
+            if (
+                entry is None
+                or connection.host != host
+                or connection.port != port
+                or connection.password != password
+            ):
+                if entry is not None:
+                    entry.connection.close()
+                entry = _PoolEntry(
+                    RconConnection(
+                        host, port, password, self.timeout_seconds, self.connect_timeout_seconds
+                    )
+                )
+                self._entries[key] = entry
+            self._ensure_sweeper()
+
+        with entry.lock:
+            reused = entry.connection.connected
+            try:
+                return entry.connection.execute(commands, stop_on_error)
+            except RconUnavailable:
+                with self._lock:
+                    self._unavailable[key] = time.monotonic() + self.unavailable_seconds
+                raise
+            except RconError:
+                # A pooled session can go stale when the server restarts; log in again once.
+                # Timeouts and partial answers are never replayed.
+                if not reused or not entry.connection.stale:
+                    raise
+                logger.info("RCON session for %s went stale; reconnecting", key[:12])
+                return entry.connection.execute(commands, stop_on_error)
+
+    def close(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            self._unavailable.pop(key, None)
+        if entry is not None:
+            # Not under the entry lock: a command blocked on a dead server fails fast instead.
+            entry.connection.close()
+
+    def close_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                if entry.connection.connected and entry.connection.last_used < cutoff:
+                    entry.connection.close()
+            finally:
+                entry.lock.release()
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(target=self._sweep_loop, daemon=True, name="rcon-idle-sweeper")
+        self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        interval = max(5.0, self.idle_seconds / 4)
+        while True:
+            time.sleep(interval)
+            try:
+                self.close_idle()
+            except Exception:
+                logger.exception("RCON idle sweep failed")
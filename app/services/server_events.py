@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+from ..docker_client import ContainerInventory
+from ..models import ServerInfo
+
+logger = logging.getLogger(__name__)
+
+
+class ServerEventHub:
+    """
+    Fans container inventory changes out to browser subscribers as ``ServerInfo`` deltas.
+
+    There is one upstream subscription (the inventory's Docker events stream) no matter how
+    many browsers are connected. The hub remembers the last info it published per server and
+    only emits when something visible changed, so event bursts such as die/stop/kill for one
+    shutdown collapse into a single update.
+    """
+
+    # A viewer this far behind gets a fresh snapshot instead of the backlog.
+    QUEUE_SIZE = 256
+
+    def __init__(
+        self,
+        inventory: ContainerInventory,
+        to_info: Callable[[dict[str, Any]], ServerInfo],
+    ) -> None:
+        self.inventory = inventory
+        self.to_info = to_info
+        self._lock = threading.Lock()
+        self._known: dict[str, dict[str, Any]] = {}
+        self._server_ids: dict[str, str] = {}
+        self._subscribers: list[asyncio.Queue] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        inventory.subscribe(self._on_inventory_change)
+
+    async def events(self, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[dict[str, Any]]]:
+        """
+        Yields ``{"type": "snapshot", "servers": [...]}`` first, then ``server`` upserts and
+        ``removed`` deltas as they happen.
+
+        ``None`` is yielded when nothing changed for ``keepalive_seconds`` so SSE writers can
+        send a heartbeat.
+        """
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.append(queue)
+        try:
+            yield await self._snapshot()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["type"] == "overflow":
+                    yield await self._snapshot()
+                    continue
+                yield event
+        finally:
+            with self._lock:
+                if queue in self._subscribers:
+                    self._subscribers.remove(queue)
+
+    async def _snapshot(self) -> dict[str, Any]:
+        # to_info may inspect an image whose tags are not cached yet; keep it off the loop.
+        servers = await asyncio.to_thread(self._build_snapshot)
+        return {"type": "snapshot", "servers": servers}
+
+    def _build_snapshot(self) -> list[dict[str, Any]]:
+        return [self.to_info(summary).model_dump() for summary in self.inventory.summaries()]
+
+    def _on_inventory_change(self, action: str, container_id: str, summary) -> None:
+        if action == "resync":
+            self.refresh()
+            return
+        if summary is None:
+            self._remove(container_id)
+            return
+        self._upsert(container_id, summary)
+
+    def _upsert(self, container_id: str, summary: dict[str, Any]) -> None:
+        try:
+            info = self.to_info(summary).model_dump()
+        except Exception:
+            logger.exception("Failed to build server info for %s", container_id)
+            return
+        server_id = info.get("server_id")
+        if not server_id:
+            return
+        with self._lock:
+            if self._known.get(server_id) == info:
+                return
+            self._known[server_id] = info
+            self._server_ids[container_id] = server_id
+        self._publish({"type": "server", "server": info})
+
+    def _remove(self, container_id: str) -> None:
+        with self._lock:
+            server_id = self._server_ids.pop(container_id, None)
+            if server_id is None:
+                return
+            self._known.pop(server_id, None)
+        self._publish({"type": "removed", "server_id": server_id})
+
+    def refresh(self) -> None:
+        """Rebuilds every server's info and publishes the ones that changed."""
+        summaries = self.inventory.summaries()
+        current = {summary.get("Id") for summary in summaries}
+        with self._lock:
+            gone = [cid for cid in self._server_ids if cid not in current]
+        for container_id in gone:
+            self._remove(container_id)
+        for summary in summaries:
+            self._upsert(summary.get("Id", ""), summary)
+
+    def _publish(self, event: dict[str, Any]) -> None:
+        loop = self._loop
+        with self._lock:
+            if loop is None or not self._subscribers:
+                return
+        try:
+            loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            pass
+
+    def _deliver(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            queues = list(self._subscribers)
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Replace the backlog with a marker; the reader will send a full snapshot.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "overflow"})
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from ..models import ServerStatus
+
+logger = logging.getLogger(__name__)
+
+# Status requests are answered regardless of the protocol version in the handshake.
+HANDSHAKE_PROTOCOL = -1
+MAX_STATUS_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    server_id: str
+    host: str
+    port: int
+
+
+class StatusProbeError(Exception):
+    pass
+
+
+def _varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _packet(packet_id: int, payload: bytes) -> bytes:
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+def _decode_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    result = 0
+    for shift in range(0, 35, 7):
+        if offset >= len(data):
+            raise StatusProbeError("Truncated VarInt")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+    raise StatusProbeError("VarInt too long")
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise StatusProbeError("VarInt too long")
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    length = await _read_varint(reader)
+    if length <= 0 or length > MAX_STATUS_BYTES:
+        raise StatusProbeError("Malformed status packet")
+    data = await reader.readexactly(length)
+    packet_id = data[0]
+    return packet_id, data[1:]
+
+
+def _flatten_motd(description: Any) -> str:
+    if isinstance(description, str):
+        return description
+    if isinstance(description, dict):
+        text = str(description.get("text") or "")
+        for extra in description.get("extra") or []:
+            text += _flatten_motd(extra)
+        return text
+    if isinstance(description, list):
+        return "".join(_flatten_motd(item) for item in description)
+    return ""
+
+
+async def server_list_ping(host: str, port: int, timeout_seconds: float) -> tuple[dict[str, Any], float]:
+    """
+    Runs a Server List Ping (handshake, status request, ping) against ``host:port``.
+
+    Returns the decoded status JSON and the ping round trip in milliseconds.
+    """
+
+    async def exchange() -> tuple[dict[str, Any], float]:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            address = host.encode("utf-8")
+            handshake = (
+                _varint(HANDSHAKE_PROTOCOL)
+                + _varint(len(address))
+                + address
+                + struct.pack(">H", port)
+                + _varint(1)
+            )
+            writer.write(_packet(0x00, handshake) + _packet(0x00, b""))
+            await writer.drain()
+            packet_id, payload = await _read_packet(reader)
+            if packet_id != 0x00:
+                raise StatusProbeError("Unexpected status response")
+            length, offset = _decode_varint(payload)
+            status = json.loads(payload[offset : offset + length].decode("utf-8"))
+            if not isinstance(status, dict):
+                raise StatusProbeError("Unexpected status payload")
+
+            token = int(time.time() * 1000)
+            started = time.perf_counter()
+            writer.write(_packet(0x01, struct.pack(">q", token)))
+            await writer.drain()
+            await _read_packet(reader)
+            latency_ms = (time.perf_counter() - started) * 1000
+            return status, latency_ms
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    return await asyncio.wait_for(exchange(), timeout=timeout_seconds)
+
+
+class StatusProber:
+    """
+    Pings every running managed server on an interval and caches what it learns.
+
+    One probe round covers all targets with at most ``concurrency`` connections in flight.
+    Results older than ``ttl_seconds`` are treated as unknown. ``on_round`` runs after each
+    round so listeners (the server event stream) can pick up changed player counts.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], list[ProbeTarget]],
+        interval_seconds: float = 15.0,
+        timeout_seconds: float = 3.0,
+        concurrency: int = 16,
+        on_round: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        self.targets = targets
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.concurrency = max(1, concurrency)
+        self.ttl_seconds = max(interval_seconds * 2, timeout_seconds * 2)
+        self.on_round = on_round
+        self._cache: dict[str, tuple[float, ServerStatus]] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is not None or self.interval_seconds <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        logger.info("Status prober started (every %ss)", self.interval_seconds)
+
+    def cached(self, server_id: str) -> Optional[ServerStatus]:
+        entry = self._cache.get(server_id)
+        if entry is None:
+            return None
+        fetched_at, status = entry
+        if time.monotonic() - fetched_at > self.ttl_seconds:
+            return None
+        return status
+
+    def forget(self, server_id: str) -> None:
+        self._cache.pop(server_id, None)
+
+    async def probe(self, target: ProbeTarget) -> ServerStatus:
+        checked_at = datetime.now(timezone.utc).isoformat()
+        try:
+            status, latency_ms = await server_list_ping(target.host, target.port, self.timeout_seconds)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, StatusProbeError, ValueError) as exc:
+            result = ServerStatus(
+                server_id=target.server_id,
+                online=False,
+                checked_at=checked_at,
+                error=str(exc) or exc.__class__.__name__,
+            )
+        else:
+            players = status.get("players") or {}
+            version = status.get("version") or {}
+            result = ServerStatus(
+                server_id=target.server_id,
+                online=True,
+                latency_ms=round(latency_ms, 2),
+                players_online=players.get("online"),
+                players_max=players.get("max"),
+                motd=_flatten_motd(status.get("description")),
+                version_name=version.get("name"),
+                protocol=version.get("protocol"),
+                checked_at=checked_at,
+            )
+        self._cache[target.server_id] = (time.monotonic(), result)
+        return result
+
+    async def probe_all(self) -> None:
+        targets = await asyncio.to_thread(self.targets)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(target: ProbeTarget) -> None:
+            async with semaphore:
+                await self.probe(target)
+
+        await asyncio.gather(*(bounded(target) for target in targets))
+        live = {target.server_id for target in targets}
+        for server_id in list(self._cache):
+            if server_id not in live:
+                self._cache.pop(server_id, None)
+
+    async def _loop(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.probe_all()
+                if self.on_round is not None:
+                    await self.on_round()
+            except Exception:
+                logger.exception("Status probe round failed")
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(1.0, self.interval_seconds - elapsed))
@@ -94,6 +94,9 @@ const PANEL_BASE_PATH = "/panel";
 
 let servers = [];
 let activeServerId = null;
+// Player counts fetched on demand when the server list carries none (scheduled probes are
+// off by default while autopause is enabled, since a ping wakes a paused server).
+let serverStatuses = {};
 let modVersionCache = {};
 let modSearchToken = 0;
 let modpackVersionCache = {};
@@ -108,6 +111,8 @@ let logBuffer = "";
 const MAX_LOG_CHARS = 200000;
 let currentUser = null;
 let isLoadingServers = false;
+let serverEvents = null;
+let serverStatusWaiters = [];
 const pendingServerActions = {};
 let activeViewId = "view-servers";
 let activeSettingsTab = "settings-gameplay";
@@ -326,6 +331,28 @@ async function apiRequest(path, options = {}) {
   return response.text();
 }
 
+function waitForJob(job, onProgress) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/jobs/${job.id}/events`);
+    source.addEventListener("job", (event) => {
+      const snapshot = JSON.parse(event.data);
+      if (onProgress) onProgress(snapshot);
+      if (snapshot.status === "succeeded") {
+        source.close();
+        resolve(snapshot.result);
+      } else if (snapshot.status === "failed") {
+        source.close();
+        reject(new Error(snapshot.error || "Job failed"));
+      }
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        reject(new Error("Lost connection to job progress"));
+      }
+    };
+  });
+}
+
 async function apiUpload(path, formData) {
   const response = await fetch(path, {
     method: "POST",
@@ -745,6 +772,11 @@ function renderServers() {
     const status = (displayedStatus || "stopped").toLowerCase();
     const statusClass = status === "running" ? "running" : status === "stopped" ? "stopped" : "pending";
     const portLabel = server.port ? `:${server.port}` : "auto";
+    const live = server.online != null ? server : serverStatuses[server.server_id];
+    const playersLabel =
+      server.status === "running" && live && live.online && live.players_online != null
+        ? ` • ${live.players_online}/${live.players_max ?? "?"} players`
+        : "";
     card.innerHTML = `
       <div>
         <div class="server-title-row">
@@ -757,7 +789,7 @@ function renderServers() {
             </div>
           </div>
         </div>
-        <div class="server-meta">${server.server_type || "VANILLA"} • ${server.version || "latest"} • ${portLabel}</div>
+        <div class="server-meta">${server.server_type || "VANILLA"} • ${server.version || "latest"} • ${portLabel}${playersLabel}</div>
       </div>
       <div class="server-actions">
         <button class="btn small" data-action="select" data-id="${server.server_id}">Select</button>
@@ -801,6 +833,9 @@ function setActiveServer(serverId) {
   }
   activeServerName.textContent = server.name;
   activeServerMeta.textContent = `${server.server_type || "VANILLA"} • ${server.version || "latest"}`;
+  if (server.status === "running" && server.online == null && previousServerId !== serverId) {
+    refreshServerStatus(serverId);
+  }
   settingsServerBadge.textContent = server.name;
   document.title = `${server.name} • ${defaultTitle}`;
   updateOverview(server);
@@ -823,6 +858,15 @@ function setActiveServer(serverId) {
   }
 }
 
+async function refreshServerStatus(serverId) {
+  try {
+    serverStatuses[serverId] = await apiRequest(`/servers/${serverId}/status`);
+  } catch (err) {
+    return;
+  }
+  renderServers();
+}
+
 function updateOverview(server) {
   if (!server) {
     overviewStatus.textContent = "-";
@@ -1020,6 +1064,69 @@ async function loadServers({ showLoading = true } = {}) {
   }
 }
 
+function refreshServerViews() {
+  updateCounts();
+  if (activeServerId) {
+    const active = servers.find((s) => s.server_id === activeServerId);
+    if (!active) {
+      setActiveServer(null);
+      return;
+    }
+    updateOverview(active);
+    updateActionButtons(active);
+  }
+  renderServers();
+}
+
+function resolveServerStatusWaiters() {
+  serverStatusWaiters = serverStatusWaiters.filter((waiter) => {
+    const current = servers.find((s) => s.server_id === waiter.serverId);
+    if (current && current.status !== waiter.desired) return true;
+    clearTimeout(waiter.timer);
+    waiter.resolve(current || null);
+    return false;
+  });
+}
+
+function waitForServerStatus(serverId, desired, timeoutMs) {
+  return new Promise((resolve) => {
+    const waiter = { serverId, desired, resolve, timer: null };
+    waiter.timer = setTimeout(() => {
+      serverStatusWaiters = serverStatusWaiters.filter((item) => item !== waiter);
+      resolve(servers.find((s) => s.server_id === serverId) || null);
+    }, timeoutMs);
+    serverStatusWaiters.push(waiter);
+    resolveServerStatusWaiters();
+  });
+}
+
+function connectServerEvents() {
+  if (serverEvents) return;
+  serverEvents = new EventSource("/servers/events");
+  serverEvents.addEventListener("snapshot", (event) => {
+    servers = JSON.parse(event.data).servers || [];
+    refreshServerViews();
+    resolveServerStatusWaiters();
+  });
+  serverEvents.addEventListener("server", (event) => {
+    const server = JSON.parse(event.data).server;
+    const index = servers.findIndex((s) => s.server_id === server.server_id);
+    if (index === -1) {
+      servers = [...servers, server];
+    } else {
+      servers = servers.map((s, i) => (i === index ? server : s));
+    }
+    refreshServerViews();
+    resolveServerStatusWaiters();
+  });
+  serverEvents.addEventListener("removed", (event) => {
+    const serverId = JSON.parse(event.data).server_id;
+    servers = servers.filter((s) => s.server_id !== serverId);
+    refreshServerViews();
+    resolveServerStatusWaiters();
+  });
+}
+
 function buildCreateEnv() {
   const env = {};
   env.GAMEMODE = document.getElementById("createGamemode").value;
@@ -1944,10 +2051,12 @@ async function installModpack(projectId, versionId) {
     overwrite,
   };
   try {
-    const response = await apiRequest(`/servers/${activeServerId}/modpacks?restart=${restart}`, {
+    const job = await apiRequest(`/servers/${activeServerId}/modpacks?restart=${restart}&background=true`, {
       method: "POST",
       body: JSON.stringify(payload),
     });
+    toast("Modpack install started");
+    const response = await waitForJob(job);
     const name = response.modpack_name || "Modpack";
     toast(`${name} installed`, "success");
     await loadMods();
@@ -2050,17 +2159,28 @@ async function sendServerAction(action) {
   setPendingAction(serverId, action);
   setButtonLoading(actionBtn, true, `${capitalize(action)}ing…`);
   try {
-    await apiRequest(`/servers/${serverId}/${action}`, { method: "POST" });
-    toast(`${capitalize(action)} requested`, "success");
-    const deadline = Date.now() + 45000;
-    const desired = action === "start" ? "running" : action === "stop" ? "stopped" : null;
-    while (Date.now() < deadline) {
-      await loadServers({ showLoading: false });
-      const current = servers.find((s) => s.server_id === serverId);
-      if (!current) break;
-      if (desired && current.status === desired) break;
-      if (!desired) break;
-      await new Promise((resolve) => setTimeout(resolve, 900));
+    if (action === "stop") {
+      await apiRequest(`/servers/${serverId}/stop`, { method: "POST" });
+      toast("Stop requested", "success");
+      if (!serverEvents || serverEvents.readyState !== EventSource.OPEN) {
+        await loadServers({ showLoading: false });
+      } else {
+        await waitForServerStatus(serverId, "exited", 45000);
+      }
+    } else {
+      toast(`${capitalize(action)} requested`, "success");
+      const job = await apiRequest(`/servers/${serverId}/${action}?wait=ready&background=true`, {
+        method: "POST",
+      });
+      const result = await waitForJob(job);
+      if (result && result.ready) {
+        toast(`Server ready in ${result.boot_seconds}s`, "success");
+      } else {
+        toast("Server did not report ready yet; check the console", "error");
+      }
+      if (!serverEvents || serverEvents.readyState !== EventSource.OPEN) {
+        await loadServers({ showLoading: false });
+      }
     }
   } catch (err) {
     toast(err.message, "error");
@@ -2489,6 +2609,7 @@ window.addEventListener("DOMContentLoaded", () => {
   loadCurrentUser().then((authenticated) => {
     if (authenticated) {
       loadServers();
+      connectServerEvents();
       loadVersionMetadata();
     }
   });